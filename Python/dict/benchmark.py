@@ -0,0 +1,214 @@
+"""
+Benchmark suite for the Dict implementations
+
+Runs dictionary.Dict, dictionary_without_delete.Dict and the builtin dict
+over a set of workloads and sizes, with a warmup run and repeated timed
+runs, and reports the median and interquartile range of each. Peak memory
+comes from one extra run under tracemalloc, which is kept out of the
+timings.
+
+    python benchmark.py run --sizes 1e3 1e4 1e5 --out before.json
+    python benchmark.py run --sizes 1e3 1e4 1e5 --out after.json
+    python benchmark.py compare before.json after.json --threshold 0.1
+
+compare flags every case whose median got slower by more than threshold,
+and exits with status 1 if there are any.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tracemalloc
+from time import perf_counter_ns
+
+import dictionary
+import dictionary_without_delete
+
+IMPLEMENTATIONS = {
+    "Dict": dictionary.Dict,
+    "without_delete": dictionary_without_delete.Dict,
+    "dict": dict,
+}
+
+
+def _build(cls, keys):
+    d = cls()
+    for i, k in enumerate(keys):
+        d[k] = i
+    return d
+
+
+def _lookup_all(d, keys):
+    # get() rather than [], so a broken implementation can't abort the run
+    get = d.get
+    for k in keys:
+        get(k)
+
+
+def _random_strings(n, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=12)) for _ in range(n)]
+
+
+# Each workload is (setup, run): setup(cls, n) is untimed and returns the
+# arguments for run, the timed part. setup runs again before every run.
+
+def _insert_lookup(make_keys):
+    def setup(cls, n):
+        return cls, make_keys(n)
+
+    def run(cls, keys):
+        _lookup_all(_build(cls, keys), keys)
+    return setup, run
+
+
+def _churn_setup(cls, n):
+    return _build(cls, range(n)), n
+
+
+def _churn_run(d, n):
+    # Replace every key once, oldest first
+    for i in range(n, 2 * n):
+        d[i] = i
+        del d[i - n]
+
+
+def _misses_setup(cls, n):
+    return _build(cls, range(n)), range(n, 2 * n)
+
+
+WORKLOADS = {
+    "sequential_ints": _insert_lookup(lambda n: list(range(n))),
+    "random_strings": _insert_lookup(_random_strings),
+    # hashes differ only above bit 32, so they share every low bit
+    "collisions": _insert_lookup(lambda n: [i << 32 for i in range(n)]),
+    "churn": (_churn_setup, _churn_run),
+    "misses": (_misses_setup, _lookup_all),
+}
+
+
+def supports(cls, workload):
+    return workload != "churn" or hasattr(cls, "__delitem__")
+
+
+def measure(cls, workload, n, repeat=5, memory=True):
+    setup, run = WORKLOADS[workload]
+    run(*setup(cls, n))  # warmup
+    times = []
+    for _ in range(repeat):
+        args = setup(cls, n)
+        t1 = perf_counter_ns()
+        run(*args)
+        t2 = perf_counter_ns()
+        times.append((t2 - t1) / 1e9)
+    result = {"median_s": statistics.median(times), "iqr_s": 0.0, "runs": times}
+    if repeat > 1:
+        q1, _, q3 = statistics.quantiles(times, n=4)
+        result["iqr_s"] = q3 - q1
+    if memory:
+        args = setup(cls, n)
+        tracemalloc.start()
+        try:
+            run(*args)
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_suite(sizes, implementations, workloads, repeat=5, memory=True, out=sys.stdout):
+    results = []
+    for n in sizes:
+        for workload in workloads:
+            for name in implementations:
+                cls = IMPLEMENTATIONS[name]
+                if not supports(cls, workload):
+                    continue
+                case = {"implementation": name, "workload": workload, "size": n}
+                try:
+                    case.update(measure(cls, workload, n, repeat, memory))
+                except Exception as e:
+                    case["error"] = f"{type(e).__name__}: {e}"
+                results.append(case)
+                print(format_case(case), file=out)
+    return {
+        "meta": {
+            "python": sys.version,
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def format_case(case):
+    label = f"{case['workload']:>16} | {case['size']:>9} | {case['implementation']:>14}"
+    if "error" in case:
+        return f"{label} | failed: {case['error']}"
+    line = f"{label} | median {case['median_s'] * 1000:10.2f} ms | IQR {case['iqr_s'] * 1000:8.2f} ms"
+    if "peak_bytes" in case:
+        line += f" | peak {case['peak_bytes'] / 2 ** 20:8.2f} MiB"
+    return line
+
+
+def compare(old, new, threshold=0.1):
+    """Cases whose median grew by more than threshold, as (case, ratio) pairs"""
+    def key(case):
+        return case["implementation"], case["workload"], case["size"]
+
+    before = {key(case): case for case in old["results"] if "error" not in case}
+    regressions = []
+    for case in new["results"]:
+        base = before.get(key(case))
+        if base is None or "error" in case:
+            continue
+        ratio = case["median_s"] / base["median_s"]
+        if ratio > 1 + threshold:
+            regressions.append((case, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5],
+                            help="table sizes, up to 1e7 (pure Python Dicts take minutes at that size)")
+    run_parser.add_argument("--implementations", nargs="+", choices=list(IMPLEMENTATIONS),
+                            default=list(IMPLEMENTATIONS))
+    run_parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    run_parser.add_argument("--out", help="write JSON results here")
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="relative slowdown of the median that counts as a regression")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        report = run_suite([int(n) for n in args.sizes], args.implementations, args.workloads,
+                           args.repeat, not args.no_memory)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=2)
+        return 0
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = compare(old, new, args.threshold)
+    for case, ratio in regressions:
+        print(f"REGRESSION {format_case(case)} | {ratio:.2f}x the old median")
+    print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
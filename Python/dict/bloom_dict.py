@@ -0,0 +1,175 @@
+"""
+Dict backend with a counting Bloom filter in front of the index
+
+Every live key sets `hashes` counters of the filter. get, __contains__ and
+__getitem__ check those counters first and only walk the probe sequence if
+all of them are non-zero, so most misses never touch the index, its
+tombstones or the entry arrays. Deleting a key decrements its counters
+again; a counter that reached 255 stays there, since it can no longer be
+told how many keys share it. That can only cost false positives, never a
+false negative, and resizes rebuild the filter from the live keys anyway.
+
+The filter is sized with the table, counters_per_slot byte counters per
+index slot (4 by default: 6 to 12 counters per key between Dict's 1/3 and
+2/3 load), and filter_stats() reports its memory and false positive rate.
+"""
+from math import exp
+
+from dictionary import Dict, DELETED, DUMMY, HASH_MASK
+
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+class CountingBloomFilter:
+    def __init__(self, counters, hashes=3):
+        if counters & (counters - 1):
+            raise ValueError("counters must be a power of two")
+        self.counts = bytearray(counters)
+        self.mask = counters - 1
+        self.hashes = hashes
+
+    def _positions(self, key_hash):
+        # Double hashing over the two halves of a Fibonacci-mixed hash
+        h = ((key_hash & HASH_MASK) * _GOLDEN) & HASH_MASK
+        step = (h & 0xFFFFFFFF) | 1
+        h >>= 32
+        mask = self.mask
+        return [(h + j * step) & mask for j in range(self.hashes)]
+
+    def add(self, key_hash):
+        counts = self.counts
+        for i in self._positions(key_hash):
+            if counts[i] < 255:
+                counts[i] += 1
+
+    def remove(self, key_hash):
+        counts = self.counts
+        for i in self._positions(key_hash):
+            if counts[i] < 255:
+                counts[i] -= 1
+
+    def might_contain(self, key_hash):
+        counts = self.counts
+        for i in self._positions(key_hash):
+            if not counts[i]:
+                return False
+        return True
+
+    def expected_fp_rate(self, n):
+        """False positive rate of a filter holding n keys"""
+        k = self.hashes
+        return (1 - exp(-k * n / len(self.counts))) ** k
+
+
+class BloomDict(Dict):
+    counters_per_slot = 4
+
+    def __init__(self, capacity=0, filter_hashes=3, **kwargs):
+        self.filter_hashes = filter_hashes
+        self.rejected = 0  # misses the filter answered alone
+        self.false_positives = 0  # misses that got past it
+        super().__init__(capacity, **kwargs)
+        self._rebuild_filter()
+
+    def _rebuild_filter(self):
+        self.filter = CountingBloomFilter(self.max_len * self.counters_per_slot, self.filter_hashes)
+        for key_hash, k in zip(self.entry_hashes, self.entry_keys):
+            if k is not DELETED:
+                self.filter.add(key_hash)
+
+    def _resize(self, length):
+        super()._resize(length)
+        self._rebuild_filter()
+
+    def _insert_hashed(self, entries):
+        for key_hash, k, v in entries:
+            idx, ix = self._lookup(key_hash, k)
+            if ix >= 0:
+                self.entry_values[ix] = v
+                continue
+            self.filter.add(key_hash)
+            self.index_list[idx] = len(self.entry_keys)
+            self.entry_hashes.append(key_hash)
+            self.entry_keys.append(k)
+            self.entry_values.append(v)
+            self.size += 1
+            self.version += 1
+
+    def __setitem__(self, k, v):
+        key_hash = hash(k)
+        idx, ix = self._lookup(key_hash, k)
+        if ix >= 0:
+            self.entry_values[ix] = v
+            return
+
+        self.filter.add(key_hash)
+        self.index_list[idx] = len(self.entry_keys)
+        self.entry_hashes.append(key_hash)
+        self.entry_keys.append(k)
+        self.entry_values.append(v)
+        self.size += 1
+        self.version += 1
+        self._check_and_resize()
+
+    def __delitem__(self, k):
+        key_hash = hash(k)
+        idx, ix = self._lookup(key_hash, k)
+        if ix < 0:
+            raise KeyError(k)
+        self.filter.remove(key_hash)
+        self.index_list[idx] = DUMMY
+        self.entry_keys[ix] = DELETED
+        self.entry_values[ix] = None
+        self.size -= 1
+        self.version += 1
+        self._check_and_compact()
+
+    def _find(self, k):
+        # Entry index of k, or -1 when the filter or the probe rules it out
+        key_hash = hash(k)
+        f = self.filter
+        counts = f.counts
+        mask = f.mask
+        # CountingBloomFilter.might_contain, inlined
+        h = ((key_hash & HASH_MASK) * _GOLDEN) & HASH_MASK
+        step = (h & 0xFFFFFFFF) | 1
+        i = h >> 32
+        for _ in range(f.hashes):
+            if not counts[i & mask]:
+                self.rejected += 1
+                return -1
+            i += step
+        ix = self._lookup(key_hash, k)[1]
+        if ix < 0:
+            self.false_positives += 1
+        return ix
+
+    def __getitem__(self, k):
+        ix = self._find(k)
+        if ix >= 0:
+            return self.entry_values[ix]
+        raise KeyError(k)
+
+    def get(self, k, optional=None):
+        ix = self._find(k)
+        if ix >= 0:
+            return self.entry_values[ix]
+        return optional
+
+    def __contains__(self, k):
+        return self._find(k) >= 0
+
+    def filter_stats(self):
+        """Size of the filter next to the table's, and how well it filters misses"""
+        misses = self.rejected + self.false_positives
+        return {
+            "counters": len(self.filter.counts),
+            "hashes": self.filter.hashes,
+            "filter_bytes": len(self.filter.counts),
+            "index_bytes": self.index_list.itemsize * self.max_len,
+            "entry_hash_bytes": self.entry_hashes.itemsize * len(self.entry_hashes),
+            "expected_fp_rate": self.filter.expected_fp_rate(self.size),
+            "observed_fp_rate": self.false_positives / misses if misses else 0.0,
+            "rejected": self.rejected,
+            "false_positives": self.false_positives,
+        }
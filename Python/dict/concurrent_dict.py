@@ -0,0 +1,122 @@
+"""
+Thread-safe Dict made of independently locked segments
+
+Keys are spread over a power of two number of segments, each an ordinary
+Dict with its own lock, so writers to different segments never wait for
+each other and a resize only stalls its own segment.
+
+Reads don't lock. Each segment has a sequence number that a writer makes
+odd before it changes the segment and even again after (a seqlock). A
+reader notes the number, does a plain Dict lookup and checks the number
+again; if a write started or ran in between, the lookup may have seen a
+half-resized table, so it is retried under the lock.
+
+A single Dict operation is not atomic even under the GIL: _resize swaps
+index_list and the entry arrays in separate steps, and a thread switch can
+fall between them (see Python/gil/GIL.md).
+"""
+import threading
+
+from dictionary import Dict, HASH_MASK
+
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+class _Segment:
+    __slots__ = ("table", "lock", "seq")
+
+    def __init__(self):
+        self.table = Dict()
+        self.lock = threading.Lock()
+        self.seq = 0  # odd while a writer is changing table
+
+
+class ConcurrentDict:
+    def __init__(self, segments=16):
+        if segments < 1 or segments & (segments - 1):
+            raise ValueError("segments must be a power of two")
+        self.segments = [_Segment() for _ in range(segments)]
+        self._shift = 64 - (segments.bit_length() - 1)
+
+    def _segment(self, key_hash):
+        # Top bits of a Fibonacci hash; plain low bits would send small
+        # ints to the same few segments that Dict indexes them by
+        return self.segments[(((key_hash & HASH_MASK) * _GOLDEN) & HASH_MASK) >> self._shift]
+
+    def _read(self, k, read):
+        seg = self._segment(hash(k))
+        seq = seg.seq
+        if not seq & 1:
+            try:
+                result = read(seg.table, k)
+            except KeyError:
+                if seg.seq == seq:
+                    raise
+            except Exception:
+                pass  # maybe a torn read; a real error comes back under the lock
+            else:
+                if seg.seq == seq:
+                    return result
+        with seg.lock:
+            return read(seg.table, k)
+
+    def _write(self, k, write, *args):
+        seg = self._segment(hash(k))
+        with seg.lock:
+            seg.seq += 1
+            try:
+                return write(seg.table, k, *args)
+            finally:
+                seg.seq += 1
+
+    def __getitem__(self, k):
+        return self._read(k, Dict.__getitem__)
+
+    def get(self, k, optional=None):
+        return self._read(k, lambda table, k: table.get(k, optional))
+
+    def __contains__(self, k):
+        return self._read(k, Dict.__contains__)
+
+    def __setitem__(self, k, v):
+        self._write(k, Dict.__setitem__, v)
+
+    def __delitem__(self, k):
+        self._write(k, Dict.__delitem__)
+
+    def setdefault(self, k, default=None):
+        """Value of k, first setting it to default if missing, atomically"""
+        def write(table, k):
+            _, ix = table._lookup(hash(k), k)
+            if ix >= 0:
+                return table.entry_values[ix]
+            table[k] = default
+            return default
+        return self._write(k, write)
+
+    def __len__(self):
+        # Segments are counted one after another, so only exact when quiet
+        return sum(len(seg.table) for seg in self.segments)
+
+    def items(self):
+        """Snapshot of the items, taken segment by segment under each lock"""
+        items = []
+        for seg in self.segments:
+            with seg.lock:
+                items.extend(seg.table.items())
+        return items
+
+    def keys(self):
+        return [k for k, _ in self.items()]
+
+    def values(self):
+        return [v for _, v in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __repr__(self):
+        return "".join([f"{k} - {v}\n" for k, v in self.items()])
+
+    def __str__(self):
+        return self.__repr__()
@@ -0,0 +1,316 @@
+"""
+Dict backend with copy-on-write snapshots
+
+The index and the entry arrays are split into chunks of 2**chunk_bits
+slots. snapshot() and copy() share every chunk with the original and only
+hand out new ownership tokens (epochs), so they cost O(1). A chunk belongs
+to the Dict whose epoch it was last written under; writing to a chunk owned
+by someone else copies that one chunk first. The first write after sharing
+also copies the short lists of chunks (n / 2**chunk_bits references).
+
+Snapshots are read-only, so the chunks they hold never change: a reader
+gets a consistent point-in-time view while writes go on in the original.
+
+index_list and the entry_* attributes still read as flat arrays (built on
+each access, O(n)), so everything in Dict that reads whole tables, such as
+iteration, to_bytes and freeze(), works unchanged. Assigning a flat array
+splits it into chunks.
+"""
+from array import array
+
+from dictionary import Dict, DELETED, DUMMY, EMPTY, HASH_MASK, PERTURB_SHIFT, _growth_length, _index_typecode, \
+    _length_for, _as_int_array, np
+
+CHUNK_BITS = 10
+
+
+def _chunked(flat, bits):
+    step = 1 << bits
+    return [flat[i:i + step] for i in range(0, len(flat), step)]
+
+
+class CowDict(Dict):
+    def __init__(self, capacity=0, chunk_bits=CHUNK_BITS, **kwargs):
+        self.chunk_bits = chunk_bits
+        self._epoch = object()
+        self._dirs_shared = False
+        super().__init__(capacity, **kwargs)
+
+    # Flat views of the chunks
+
+    @property
+    def index_list(self):
+        flat = self._index[0][:0]
+        for chunk in self._index:
+            flat.extend(chunk)
+        return flat
+
+    @index_list.setter
+    def index_list(self, index_list):
+        self._index = _chunked(index_list, self.chunk_bits)
+        self._index_owners = [self._epoch] * len(self._index)
+
+    @property
+    def entry_hashes(self):
+        flat = array("q")
+        for chunk in self._hashes:
+            flat.extend(chunk)
+        return flat
+
+    @entry_hashes.setter
+    def entry_hashes(self, entry_hashes):
+        self._hashes = _chunked(entry_hashes, self.chunk_bits)
+        self._entry_owners = [self._epoch] * len(self._hashes)
+        self.used = len(entry_hashes)
+
+    @property
+    def entry_keys(self):
+        return [k for chunk in self._keys for k in chunk]
+
+    @entry_keys.setter
+    def entry_keys(self, entry_keys):
+        self._keys = _chunked(entry_keys, self.chunk_bits)
+
+    @property
+    def entry_values(self):
+        return [v for chunk in self._values for v in chunk]
+
+    @entry_values.setter
+    def entry_values(self, entry_values):
+        self._values = _chunked(entry_values, self.chunk_bits)
+
+    # Sharing
+
+    def _share(self, cls):
+        other = object.__new__(cls)
+        other.__dict__.update(self.__dict__)
+        other.__dict__.pop("_stats", None)
+        # Fresh epochs on both sides: neither owns any chunk any more
+        self._epoch = object()
+        other._epoch = object()
+        self._dirs_shared = other._dirs_shared = True
+        return other
+
+    def snapshot(self):
+        """Read-only copy of the current contents, sharing all storage"""
+        return self._share(CowSnapshot)
+
+    def copy(self):
+        return self._share(CowDict)
+
+    def _own_dirs(self):
+        if self._dirs_shared:
+            self._index = self._index[:]
+            self._index_owners = self._index_owners[:]
+            self._hashes = self._hashes[:]
+            self._keys = self._keys[:]
+            self._values = self._values[:]
+            self._entry_owners = self._entry_owners[:]
+            self._dirs_shared = False
+
+    def _set_slot(self, i, ix):
+        self._own_dirs()
+        c = i >> self.chunk_bits
+        if self._index_owners[c] is not self._epoch:
+            self._index[c] = self._index[c][:]
+            self._index_owners[c] = self._epoch
+        self._index[c][i & ((1 << self.chunk_bits) - 1)] = ix
+
+    def _own_entries(self, ix):
+        # Chunk number of entry ix, after making sure this Dict owns it
+        self._own_dirs()
+        c = ix >> self.chunk_bits
+        if c == len(self._hashes):
+            self._hashes.append(array("q"))
+            self._keys.append([])
+            self._values.append([])
+            self._entry_owners.append(self._epoch)
+        elif self._entry_owners[c] is not self._epoch:
+            self._hashes[c] = self._hashes[c][:]
+            self._keys[c] = self._keys[c][:]
+            self._values[c] = self._values[c][:]
+            self._entry_owners[c] = self._epoch
+        return c
+
+    def _append(self, key_hash, k, v):
+        ix = self.used
+        c = self._own_entries(ix)
+        self._hashes[c].append(key_hash)
+        self._keys[c].append(k)
+        self._values[c].append(v)
+        self.used += 1
+        return ix
+
+    def _set_value(self, ix, v):
+        c = self._own_entries(ix)
+        self._values[c][ix & ((1 << self.chunk_bits) - 1)] = v
+
+    # Dict's operations over chunks
+
+    def _lookup(self, key_hash, k):
+        index = self._index
+        hashes = self._hashes
+        keys = self._keys
+        bits = self.chunk_bits
+        low = (1 << bits) - 1
+        mask = self.max_len - 1
+        perturb = key_hash & HASH_MASK
+        i = perturb & mask
+        while True:
+            ix = index[i >> bits][i & low]
+            if ix == EMPTY:
+                return i, EMPTY
+            if ix >= 0 and hashes[ix >> bits][ix & low] == key_hash:
+                key = keys[ix >> bits][ix & low]
+                if key is k or key == k:
+                    return i, ix
+            perturb >>= PERTURB_SHIFT
+            i = (5 * i + perturb + 1) & mask
+
+    def _resize(self, length):
+        live = [(h, k, v) for h, k, v in zip(self.entry_hashes, self.entry_keys, self.entry_values)
+                if k is not DELETED]
+        self.version += 1
+        self.max_len = length
+        index_list = array(_index_typecode(length), [EMPTY]) * length
+        mask = length - 1
+        for ix, (key_hash, _, _) in enumerate(live):
+            perturb = key_hash & HASH_MASK
+            i = perturb & mask
+            while index_list[i] != EMPTY:
+                perturb >>= PERTURB_SHIFT
+                i = (5 * i + perturb + 1) & mask
+            index_list[i] = ix
+        # All new chunks, owned by this Dict alone
+        self._dirs_shared = False
+        self.index_list = index_list
+        self.entry_hashes = array("q", [h for h, _, _ in live])
+        self.entry_keys = [k for _, k, _ in live]
+        self.entry_values = [v for _, _, v in live]
+
+    def _check_and_resize(self):
+        if self.used >= (self.max_len * 2) // 3:
+            self._resize(self._grown_length())
+
+    def _compacted_length(self):
+        if self.max_len > 8 and self.size < self.max_len * self.shrink_ratio:
+            return _growth_length(self.size)
+        tombstones = self.used - self.size
+        if self.compact_ratio and tombstones > self.used * self.compact_ratio:
+            return self.max_len
+        return 0
+
+    def _reserve(self, n):
+        if self.used + n >= (self.max_len * 2) // 3:
+            self._resize(max(self.max_len, _length_for(self.size + n)))
+
+    def _insert_hashed(self, entries):
+        for key_hash, k, v in entries:
+            idx, ix = self._lookup(key_hash, k)
+            if ix >= 0:
+                self._set_value(ix, v)
+                continue
+            self._set_slot(idx, self._append(key_hash, k, v))
+            self.size += 1
+            self.version += 1
+
+    def __setitem__(self, k, v):
+        key_hash = hash(k)
+        idx, ix = self._lookup(key_hash, k)
+        if ix >= 0:
+            self._set_value(ix, v)
+            return
+        self._set_slot(idx, self._append(key_hash, k, v))
+        self.size += 1
+        self.version += 1
+        self._check_and_resize()
+
+    def __getitem__(self, k):
+        idx, ix = self._lookup(hash(k), k)
+        if ix >= 0:
+            return self._values[ix >> self.chunk_bits][ix & ((1 << self.chunk_bits) - 1)]
+        raise KeyError(k)
+
+    def get(self, k, optional=None):
+        idx, ix = self._lookup(hash(k), k)
+        if ix >= 0:
+            return self._values[ix >> self.chunk_bits][ix & ((1 << self.chunk_bits) - 1)]
+        return optional
+
+    def __delitem__(self, k):
+        idx, ix = self._lookup(hash(k), k)
+        if ix < 0:
+            raise KeyError(k)
+        self._set_slot(idx, DUMMY)
+        c = self._own_entries(ix)
+        self._keys[c][ix & ((1 << self.chunk_bits) - 1)] = DELETED
+        self._values[c][ix & ((1 << self.chunk_bits) - 1)] = None
+        self.size -= 1
+        self.version += 1
+        self._check_and_compact()
+
+    def _lookup_many(self, keys, hashes):
+        # The vectorized probe reads a flat index, so go key by key
+        return np.fromiter(
+            (self._lookup(key_hash, k)[1] for key_hash, k in zip(hashes.tolist(), keys.tolist())),
+            dtype=np.int64, count=len(keys))
+
+    def set_many(self, keys, values):
+        # Dict's version writes found values straight into entry_values
+        batch = _as_int_array(keys)
+        keys = list(keys) if batch is None else batch.tolist()
+        values = list(values)
+        if len(values) != len(keys):
+            raise ValueError("keys and values must have the same length")
+        self.update(zip(keys, values))
+
+    def _trim_entries(self):
+        low = (1 << self.chunk_bits) - 1
+        while self.used and self._keys[(self.used - 1) >> self.chunk_bits][(self.used - 1) & low] is DELETED:
+            c = self._own_entries(self.used - 1)
+            self._hashes[c].pop()
+            self._keys[c].pop()
+            self._values[c].pop()
+            if not self._keys[c]:
+                del self._hashes[c], self._keys[c], self._values[c], self._entry_owners[c]
+            self.used -= 1
+        self._head = None
+
+    # Pickles hold Dict's flat arrays, not the chunks
+
+    def __getstate__(self):
+        state = {name: value for name, value in super().__getstate__().items() if not name.startswith("_")}
+        state.update(index_list=self.index_list, entry_hashes=self.entry_hashes, entry_keys=self.entry_keys,
+                     entry_values=self.entry_values)
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        self.chunk_bits = state.pop("chunk_bits", CHUNK_BITS)
+        self._epoch = object()
+        self._dirs_shared = False
+        for name in ("index_list", "entry_hashes", "entry_keys", "entry_values"):
+            setattr(self, name, state.pop(name))
+        super().__setstate__(state)
+
+    @classmethod
+    def from_bytes(cls, data):
+        # Same index layout as Dict, so the dumped index is kept as well
+        flat = Dict.from_bytes(data)
+        d = cls(compact_ratio=flat.compact_ratio, shrink_ratio=flat.shrink_ratio)
+        d.max_len = flat.max_len
+        d.index_list = flat.index_list
+        d.entry_hashes = flat.entry_hashes
+        d.entry_keys = flat.entry_keys
+        d.entry_values = flat.entry_values
+        d.size = flat.size
+        return d
+
+
+class CowSnapshot(CowDict):
+    """What CowDict.snapshot() returns: a CowDict that can't be changed"""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Dict snapshots are read-only")
+
+    __setitem__ = __delitem__ = update = set_many = _insert_hashed = _read_only
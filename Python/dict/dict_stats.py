@@ -0,0 +1,129 @@
+"""
+Opt-in probe and resize instrumentation for Dict
+
+enable() swaps counting versions of Dict's probe loop, __setitem__ and
+_resize onto the class, and disable() puts the originals back, so a Dict
+pays nothing for stats while they are off. Each instance keeps its own
+DictStats, created on its first counted operation.
+
+Counting follows Dict's own probe loop, which IncrementalDict also uses
+(its sets land in the get histogram, having their own __setitem__).
+Backends with their own probing (swiss, robinhood) still report load and
+tombstones, but not probe lengths or resizes.
+"""
+from collections import Counter
+from time import perf_counter_ns
+
+from dictionary import Dict, EMPTY, HASH_MASK, PERTURB_SHIFT
+
+_originals = {}
+
+
+class DictStats:
+    def __init__(self):
+        self.probes = {"get": Counter(), "set": Counter()}
+        self.resizes = 0
+        self.resize_ns = 0
+        self.eq_calls = 0
+        self.kind = "get"  # which histogram lookups go to right now
+
+    def as_dict(self):
+        return {
+            # string keys, so the histograms round-trip through JSON unchanged
+            "probe_histogram": {kind: {str(n): c for n, c in sorted(h.items())} for kind, h in self.probes.items()},
+            "resizes": self.resizes,
+            "resize_time_ms": self.resize_ns / 1e6,
+            "eq_calls": self.eq_calls,
+        }
+
+
+def _stats_of(d):
+    stats = d.__dict__.get("_stats")
+    if stats is None:
+        stats = d._stats = DictStats()
+    return stats
+
+
+def _lookup(self, key_hash, k):
+    # Dict._lookup, counting slots visited and key comparisons
+    stats = _stats_of(self)
+    index_list = self.index_list
+    mask = self.max_len - 1
+    perturb = key_hash & HASH_MASK
+    i = perturb & mask
+    probes = 1
+    while True:
+        ix = index_list[i]
+        if ix == EMPTY:
+            stats.probes[stats.kind][probes] += 1
+            return i, EMPTY
+        if ix >= 0 and self.entry_hashes[ix] == key_hash:
+            key = self.entry_keys[ix]
+            if key is not k:
+                stats.eq_calls += 1
+            if key is k or key == k:
+                stats.probes[stats.kind][probes] += 1
+                return i, ix
+        perturb >>= PERTURB_SHIFT
+        i = (5 * i + perturb + 1) & mask
+        probes += 1
+
+
+def _setting(method):
+    def counted(self, *args):
+        stats = _stats_of(self)
+        stats.kind = "set"
+        try:
+            return method(self, *args)
+        finally:
+            stats.kind = "get"
+    return counted
+
+
+def _timed(method):
+    def counted(self, *args):
+        t1 = perf_counter_ns()
+        method(self, *args)
+        stats = _stats_of(self)
+        stats.resizes += 1
+        stats.resize_ns += perf_counter_ns() - t1
+    return counted
+
+
+def enable():
+    if _originals:
+        return
+    for name in ("_lookup", "__setitem__", "_insert_hashed", "_resize"):
+        _originals[name] = Dict.__dict__[name]
+    Dict._lookup = _lookup
+    Dict.__setitem__ = _setting(_originals["__setitem__"])
+    Dict._insert_hashed = _setting(_originals["_insert_hashed"])
+    Dict._resize = _timed(_originals["_resize"])
+
+
+def disable():
+    for name, method in _originals.items():
+        setattr(Dict, name, method)
+    _originals.clear()
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def stats_of(d):
+    """Stats of d as a JSON-ready dict"""
+    entries = len(d.entry_keys)
+    result = {
+        "enabled": is_enabled(),
+        "size": len(d),
+        "max_len": d.max_len,
+        "load_factor": len(d) / d.max_len,
+        "tombstone_ratio": (entries - len(d)) / entries if entries else 0.0,
+    }
+    result.update((d.__dict__.get("_stats") or DictStats()).as_dict())
+    return result
+
+
+def reset(d):
+    d.__dict__.pop("_stats", None)
@@ -1,139 +1,603 @@
 """
 Python clone of CPython implementation of python dictionary
+
+Storage follows CPython's compact dict layout: a sparse index table holding
+small integers (typed `array`, sized by capacity) that point into dense,
+insertion-ordered entry arrays of hashes, keys and values.
 """
+import importlib
+import pickle
+import struct
+import sys
+from array import array
+from collections.abc import ItemsView, KeysView, ValuesView
+from itertools import compress
+from operator import eq
+
+try:
+    import numpy as np
+except ImportError:  # the *_many batch methods fall back to per-key calls
+    np = None
+
+PERTURB_SHIFT = 5
+HASH_MASK = (1 << sys.hash_info.width) - 1  # hashes are probed as unsigned
+
+EMPTY = -1  # index slot never used
+DUMMY = -2  # index slot whose entry was deleted
+
+
+class _Deleted:
+    def __repr__(self):
+        return "<deleted>"
+
+    def __reduce__(self):
+        # Unpickles as the module's DELETED, so `is DELETED` keeps working
+        return "DELETED"
+
+
+DELETED = _Deleted()  # placeholder left in entry_keys for removed entries
+
+
+class DictKeys(KeysView):
+    """Live view over a Dict's keys, supports set operations"""
+
+    def __iter__(self):
+        return self._mapping._iter_keys()
+
+    def __repr__(self):
+        return f"dict_keys({list(self)})"
+
+
+class DictValues(ValuesView):
+    def __iter__(self):
+        return self._mapping._iter_values()
+
+    def __repr__(self):
+        return f"dict_values({list(self)})"
+
+
+class DictItems(ItemsView):
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+    def __repr__(self):
+        return f"dict_items({list(self)})"
+
+
+def _index_typecode(length):
+    # Entry indices are always < length, so the smallest signed type that can
+    # hold `length` is enough (same rule as CPython's DK_IXSIZE).
+    if length <= 0x7F:
+        return "b"
+    if length <= 0x7FFF:
+        return "h"
+    if length <= 0x7FFFFFFF:
+        return "i"
+    return "q"
+
+
+def _new_index(length):
+    return array(_index_typecode(length), [EMPTY]) * length
+
+
+def _length_for(n):
+    # Smallest table whose 2/3 usable fraction holds n entries without a resize
+    length = 8
+    while (length * 2) // 3 <= n:
+        length *= 2
+    return length
+
+
+def _as_int_array(keys):
+    # keys as a 1-d NumPy integer array, or None if they can't be batched
+    if np is None or sys.hash_info.width != 64:
+        return None
+    if not isinstance(keys, np.ndarray):
+        try:
+            keys = np.asarray(keys)
+        except (TypeError, ValueError, OverflowError):
+            return None
+    if keys.ndim != 1 or keys.dtype.kind not in "iu":
+        return None
+    return keys
 
-class DeletedItem:
-    def __init__(self, idx):
-        self.idx = idx
 
+def _int_hashes(keys):
+    # hash() of every key, following CPython's int hash: the magnitude
+    # reduced modulo sys.hash_info.modulus, the sign kept, and -1 made -2
+    modulus = np.uint64(sys.hash_info.modulus)
+    if keys.dtype.kind == "u":
+        return (keys.astype(np.uint64) % modulus).astype(np.int64)
+    keys = keys.astype(np.int64)
+    negative = keys < 0
+    # ~k + 1 is -k without overflowing on the smallest int64
+    magnitude = np.where(negative, (~keys).view(np.uint64) + np.uint64(1), keys.view(np.uint64))
+    hashes = (magnitude % modulus).astype(np.int64)
+    hashes = np.where(negative, -hashes, hashes)
+    hashes[hashes == -1] = -2
+    return hashes
 
-class DictItem:
-    def __init__(self, h, k, v):
-        self.key_hash = h
-        self.key = k
-        self.value = v
-        self.is_deleted = False
+
+def _growth_length(size, length=8):
+    # Sized from live entries, like CPython's GROWTH_RATE
+    while length < 3 * size:
+        length *= 2
+    return length
+
+
+def _hash_fingerprint():
+    # Equal when str/bytes hashes match, i.e. same algorithm and hash seed
+    return hash(("Dict hash check", b"Dict hash check", sys.hash_info.algorithm))
+
+
+# to_bytes layout: this header, the index array, the entry hashes, then the
+# keys, values and ratios pickled together
+_MAGIC = b"PYDICT01"
+_HEADER = struct.Struct("<8sqqqqcc")  # magic, fingerprint, max_len, size, entries, typecode, byte order
+
+
+# Alternate storage engines, picked with Dict(backend=...)
+BACKENDS = {
+    "incremental": ("incremental_dict", "IncrementalDict"),
+    "robinhood": ("robin_hood_dict", "RobinHoodDict"),
+    "swiss": ("swiss_dict", "SwissDict"),
+    "cow": ("cow_dict", "CowDict"),
+    "bloom": ("bloom_dict", "BloomDict"),
+    "hardened": ("hardened_dict", "HardenedDict"),
+}
 
 
 class Dict:
-    def __init__(self):
-        self.index_list = [None] * 8
-        self.entries = []
+    def __new__(cls, *args, backend=None, **kwargs):
+        if backend is not None:
+            if cls is not Dict:
+                raise TypeError(f"backend can only be picked through Dict, not {cls.__name__}")
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown Dict backend {backend!r}")
+            module_name, class_name = BACKENDS[backend]
+            cls = getattr(importlib.import_module(module_name), class_name)
+        return super().__new__(cls)
+
+    def __init__(self, capacity=0, compact_ratio=0.5, shrink_ratio=0.125, backend=None):
+        # Deletes rebuild the table once more than compact_ratio of the used
+        # slots are tombstones, or shrink it once fewer than shrink_ratio of
+        # max_len are live. Either ratio set to 0 turns that rebuild off.
+        self.compact_ratio = compact_ratio
+        self.shrink_ratio = shrink_ratio
+        self.max_len = _length_for(capacity)
+        self.index_list = _new_index(self.max_len)
+        self.entry_hashes = array("q")
+        self.entry_keys = []
+        self.entry_values = []
         self.size = 0
-        self.max_len = 8
+        self.version = 0  # bumped whenever keys are added, removed or moved
 
-    def _get_next_index(self, key_hash, k):
-        seed = key_hash
-        p = key_hash
-        c = 0
+    def _lookup(self, key_hash, k):
+        """
+        Walk the probe sequence for k. Returns (slot, entry index); the entry
+        index is EMPTY when k is missing, and slot is then the free slot that
+        ends its chain.
+        """
+        index_list = self.index_list
+        mask = self.max_len - 1
+        perturb = key_hash & HASH_MASK
+        i = perturb & mask
         while True:
-            possible_index = (5 * seed + 1 + p) % self.max_len
-            actual_index = self.index_list[possible_index]
-            if actual_index is not None:
-                if isinstance(actual_index, DeletedItem):
-                    yield possible_index, False, True
-                elif self.entries[actual_index].key == k:
-                    yield possible_index, True, False
-            else:
-                yield possible_index, False, False
-            seed = possible_index
-            p >>= 5
-            c += 1
-            if c >= self.max_len:
-                raise RuntimeError("Something's wrong - Dict might be full")
+            ix = index_list[i]
+            if ix == EMPTY:
+                return i, EMPTY
+            if ix >= 0 and self.entry_hashes[ix] == key_hash:
+                key = self.entry_keys[ix]
+                if key is k or key == k:
+                    return i, ix
+            # Once perturb reaches 0 this is i = 5i + 1 mod 2**n, which
+            # visits every slot, so a free slot is always found.
+            perturb >>= PERTURB_SHIFT
+            i = (5 * i + perturb + 1) & mask
+
+    def _find_empty_slot(self, key_hash):
+        index_list = self.index_list
+        mask = self.max_len - 1
+        perturb = key_hash & HASH_MASK
+        i = perturb & mask
+        while index_list[i] != EMPTY:
+            perturb >>= PERTURB_SHIFT
+            i = (5 * i + perturb + 1) & mask
+        return i
 
     def _resize(self, length):
-        self.index_list = [None] * length
+        old_hashes = self.entry_hashes
+        old_keys = self.entry_keys
+        old_values = self.entry_values
+        self.version += 1
+        self.index_list = _new_index(length)
         self.max_len = length
-        old_entries = [di for di in self.entries if not di.is_deleted]
-        self.entries = []
-        self.size = 0
-        for di in old_entries:
-            self.__setitem__(di.key, di.value)
+        self.entry_hashes = array("q")
+        self.entry_keys = []
+        self.entry_values = []
+        for i, k in enumerate(old_keys):
+            if k is DELETED:
+                continue
+            key_hash = old_hashes[i]
+            self.index_list[self._find_empty_slot(key_hash)] = len(self.entry_keys)
+            self.entry_hashes.append(key_hash)
+            self.entry_keys.append(k)
+            self.entry_values.append(old_values[i])
+
+    def _grown_length(self):
+        return _growth_length(self.size, self.max_len)
 
     def _check_and_resize(self):
-        if self.size >= (self.max_len * 2) // 3:
-            self._resize(2 * self.max_len)
+        # Deleted entries still occupy the entry arrays, so the table is
+        # rebuilt once those fill up
+        if len(self.entry_keys) >= (self.max_len * 2) // 3:
+            self._resize(self._grown_length())
+
+    def _compacted_length(self):
+        # New max_len if deletes have left the table worth rebuilding, else 0
+        if self.max_len > 8 and self.size < self.max_len * self.shrink_ratio:
+            return _growth_length(self.size)
+        tombstones = len(self.entry_keys) - self.size
+        if self.compact_ratio and tombstones > len(self.entry_keys) * self.compact_ratio:
+            return self.max_len
+        return 0
+
+    def _check_and_compact(self):
+        length = self._compacted_length()
+        if length:
+            self._resize(length)
+
+    def _reserve(self, n):
+        # Make room for n more entries up front, rehashing at most once
+        if len(self.entry_keys) + n >= (self.max_len * 2) // 3:
+            self._resize(max(self.max_len, _length_for(self.size + n)))
+
+    def _insert_many(self, items):
+        self._insert_hashed((hash(k), k, v) for k, v in items)
+
+    def _insert_hashed(self, entries):
+        # Caller has reserved room, so no per-item resize checks
+        for key_hash, k, v in entries:
+            idx, ix = self._lookup(key_hash, k)
+            if ix >= 0:
+                self.entry_values[ix] = v
+                continue
+            self.index_list[idx] = len(self.entry_keys)
+            self.entry_hashes.append(key_hash)
+            self.entry_keys.append(k)
+            self.entry_values.append(v)
+            self.size += 1
+            self.version += 1
+
+    @classmethod
+    def from_items(cls, iterable):
+        if not hasattr(iterable, "__len__"):
+            iterable = list(iterable)
+        d = cls(capacity=len(iterable))
+        d._insert_many(iterable)
+        return d
+
+    @classmethod
+    def fromkeys(cls, iterable, value=None):
+        if not hasattr(iterable, "__len__"):
+            iterable = list(iterable)
+        d = cls(capacity=len(iterable))
+        d._insert_many((k, value) for k in iterable)
+        return d
+
+    def update(self, other=(), **kwargs):
+        if hasattr(other, "keys"):
+            items = [(k, other[k]) for k in other.keys()]
+        elif hasattr(other, "__len__"):
+            items = other
+        else:
+            items = list(other)
+        self._reserve(len(items) + len(kwargs))
+        self._insert_many(items)
+        self._insert_many(kwargs.items())
 
     def __setitem__(self, k, v):
         key_hash = hash(k)
-        for idx, exists, is_tomb in self._get_next_index(key_hash, k):
-            break
-        actual_index = self.index_list[idx]
-
-        if exists:
-            self.entries[actual_index].value = v
+        idx, ix = self._lookup(key_hash, k)
+        if ix >= 0:
+            self.entry_values[ix] = v
             return
 
-        di = DictItem(key_hash, k, v)
-        if is_tomb:
-            self.entries[actual_index.idx] = di
-            self.index_list[idx] = actual_index.idx
-        else:
-            self.entries.append(di)
-            self.index_list[idx] = len(self.entries) - 1
+        self.index_list[idx] = len(self.entry_keys)
+        self.entry_hashes.append(key_hash)
+        self.entry_keys.append(k)
+        self.entry_values.append(v)
         self.size += 1
+        self.version += 1
         self._check_and_resize()
 
     def __getitem__(self, k):
-        key_hash = hash(k)
-
-        for idx, exists, is_tomb in self._get_next_index(key_hash, k):
-            if not is_tomb:
-                break
-        actual_index = self.index_list[idx]
-        if exists:
-            return self.entries[actual_index].value
+        idx, ix = self._lookup(hash(k), k)
+        if ix >= 0:
+            return self.entry_values[ix]
         raise KeyError(k)
-    
-    def __delitem__(self, k):        
-        key_hash = hash(k)
-        for idx, exists, is_tomb in self._get_next_index(key_hash, k):
-            if not is_tomb:
-                break
-        actual_index = self.index_list[idx]
-        if exists:
-            self.index_list[idx] = DeletedItem(actual_index)
-            self.entries[actual_index].is_deleted = True
+
+    def __delitem__(self, k):
+        idx, ix = self._lookup(hash(k), k)
+        if ix >= 0:
+            self.index_list[idx] = DUMMY
+            self.entry_keys[ix] = DELETED
+            self.entry_values[ix] = None
             self.size -= 1
+            self.version += 1
+            self._check_and_compact()
         else:
             raise KeyError(k)
-    
+
     def __len__(self):
         return self.size
-    
+
     def __repr__(self):
-        repr = ""
-        for k, v in self.items():
-            repr += f"{k} - {v}\n"
-        return repr
-    
+        return "".join([f"{k} - {v}\n" for k, v in self.items()])
+
     def __str__(self):
         return self.__repr__()
-    
+
     def __contains__(self, k):
-        try:
-            self.__getitem__(k)
-            return True
-        except KeyError:
-            return False
-        
+        return self._lookup(hash(k), k)[1] >= 0
+
+    def _iter_keys(self):
+        version = self.version
+        for k in self.entry_keys:
+            if k is not DELETED:
+                yield k
+                if self.version != version:
+                    raise RuntimeError("Dict changed during iteration")
+
+    def _iter_values(self):
+        version = self.version
+        for k, v in zip(self.entry_keys, self.entry_values):
+            if k is not DELETED:
+                yield v
+                if self.version != version:
+                    raise RuntimeError("Dict changed during iteration")
+
+    def _iter_items(self):
+        version = self.version
+        for k, v in zip(self.entry_keys, self.entry_values):
+            if k is not DELETED:
+                yield k, v
+                if self.version != version:
+                    raise RuntimeError("Dict changed during iteration")
+
     def __iter__(self):
-        for di in self.entries:
-            if not di.is_deleted:
-                yield di.key
+        return self._iter_keys()
 
     def get(self, k, optional=None):
-        try:
-            return self.__getitem__(k)
-        except KeyError:
-            return optional or None
+        idx, ix = self._lookup(hash(k), k)
+        if ix >= 0:
+            return self.entry_values[ix]
+        return optional
+
+    def _end_entry(self, last):
+        # Entry index of the newest (last) or oldest live entry. _head
+        # remembers how many leading entries are known deleted, as long as
+        # the entry list is the same one, so popping from the front doesn't
+        # rescan the tombstones it left.
+        keys = self.entry_keys
+        if last:
+            ix = len(keys) - 1
+            while keys[ix] is DELETED:
+                ix -= 1
+            return ix
+        head = self.__dict__.get("_head")
+        ix = head[1] if head is not None and head[0] is keys else 0
+        while keys[ix] is DELETED:
+            ix += 1
+        self._head = (keys, ix)
+        return ix
+
+    def _trim_entries(self):
+        # Deleted entries at the end have no index slot pointing at them, so
+        # they can go and their entry indices be handed out again
+        keys = self.entry_keys
+        n = len(keys)
+        while n and keys[n - 1] is DELETED:
+            n -= 1
+        if n < len(keys):
+            del self.entry_hashes[n:]
+            del keys[n:]
+            del self.entry_values[n:]
+            self._head = None
+
+    def peekitem(self, last=True):
+        """Newest (last=True) or oldest (key, value) pair, left in place"""
+        if not self.size:
+            raise KeyError("peekitem(): Dict is empty")
+        ix = self._end_entry(last)
+        return self.entry_keys[ix], self.entry_values[ix]
+
+    def popitem(self, last=True):
+        """Remove and return the newest (last=True) or oldest (key, value) pair"""
+        if not self.size:
+            raise KeyError("popitem(): Dict is empty")
+        ix = self._end_entry(last)
+        k, v = self.entry_keys[ix], self.entry_values[ix]
+        del self[k]
+        self._trim_entries()
+        return k, v
+
+    def move_to_end(self, k, last=True):
+        """
+        Move k to the newest end, or the oldest with last=False. Moving to the
+        newest end appends a new entry, O(1) amortized; moving to the oldest
+        end re-adds every other key, O(n).
+        """
+        v = self[k]
+        if last:
+            newest = self.entry_keys[self._end_entry(True)]
+            if not (newest is k or newest == k):
+                del self[k]
+                self[k] = v
+            return
+        rest = [self.popitem(last=False) for _ in range(self.size)]
+        self[k] = v
+        for key, value in rest:
+            if not (key is k or key == k):
+                self[key] = value
+
+    def _lookup_many(self, keys, hashes):
+        """
+        Entry index of every key in an integer array (EMPTY when missing),
+        walking all the probe sequences together one step per pass
+        """
+        result = np.full(len(keys), EMPTY, dtype=np.int64)
+        if not self.size:
+            return result
+        index_list = np.frombuffer(self.index_list, dtype=self.index_list.typecode)
+        entry_hashes = np.frombuffer(self.entry_hashes, dtype=np.int64)
+        mask = np.uint64(self.max_len - 1)
+        pending = np.arange(len(keys))
+        perturb = hashes.view(np.uint64)
+        i = perturb & mask
+        while pending.size:
+            ix = index_list[i.astype(np.intp)].astype(np.int64)
+            done = ix == EMPTY
+            candidates = np.flatnonzero(ix >= 0)
+            candidates = candidates[entry_hashes[ix[candidates]] == hashes[pending[candidates]]]
+            if candidates.size:
+                # Equal hashes don't make equal keys (k and k + modulus share one)
+                stored = [self.entry_keys[j] for j in ix[candidates].tolist()]
+                same = np.fromiter(map(eq, stored, keys[pending[candidates]].tolist()), dtype=bool, count=len(stored))
+                candidates = candidates[same]
+                result[pending[candidates]] = ix[candidates]
+                done[candidates] = True
+            keep = ~done
+            pending = pending[keep]
+            perturb = perturb[keep] >> np.uint64(PERTURB_SHIFT)
+            i = (i[keep] * np.uint64(5) + perturb + np.uint64(1)) & mask
+        return result
+
+    def get_many(self, keys, default=None):
+        """
+        Values for a batch of keys. Integer keys are hashed and probed with
+        NumPy when it is installed. Returns a list, or a NumPy array when keys
+        is one.
+        """
+        batch = _as_int_array(keys)
+        if batch is None:
+            return [self.get(k, default) for k in keys]
+        values = self.entry_values
+        result = [values[j] if j >= 0 else default for j in self._lookup_many(batch, _int_hashes(batch)).tolist()]
+        if isinstance(keys, np.ndarray):
+            return np.fromiter(result, dtype=object, count=len(result))
+        return result
+
+    def contains_many(self, keys):
+        batch = _as_int_array(keys)
+        if batch is None:
+            return [k in self for k in keys]
+        found = self._lookup_many(batch, _int_hashes(batch)) >= 0
+        return found if isinstance(keys, np.ndarray) else found.tolist()
+
+    def set_many(self, keys, values):
+        if not hasattr(keys, "__len__"):
+            keys = list(keys)
+        values = list(values)
+        if len(values) != len(keys):
+            raise ValueError("keys and values must have the same length")
+        batch = _as_int_array(keys)
+        if batch is None:
+            self.update(zip(keys, values))
+            return
+        hashes = _int_hashes(batch)
+        ix = self._lookup_many(batch, hashes)
+        found = ix >= 0
+        entry_values = self.entry_values
+        for j, v in zip(ix[found].tolist(), compress(values, found.tolist())):
+            entry_values[j] = v
+        new = np.flatnonzero(~found)
+        if new.size:
+            self._reserve(new.size)
+            self._insert_hashed(zip(hashes[new].tolist(), batch[new].tolist(), [values[j] for j in new.tolist()]))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_stats", None)
+        state.pop("_head", None)
+        state["hash_check"] = _hash_fingerprint()
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        same_seed = state.pop("hash_check", None) == _hash_fingerprint()
+        self.__dict__.update(state)
+        if not same_seed:
+            self._rehash()
+
+    def _rehash(self):
+        # Stored hashes came from another hash seed; recompute them and rebuild
+        self.entry_hashes = array("q", [0 if k is DELETED else hash(k) for k in self.entry_keys])
+        self._resize(self.max_len)
+
+    def to_bytes(self):
+        """
+        Binary dump of the table: the index and hashes as raw arrays, so
+        from_bytes restores them as they are, with no hashing or probing
+        """
+        header = _HEADER.pack(_MAGIC, _hash_fingerprint(), self.max_len, self.size, len(self.entry_keys),
+                              self.index_list.typecode.encode(), sys.byteorder[0].encode())
+        payload = pickle.dumps((self.entry_keys, self.entry_values, self.compact_ratio, self.shrink_ratio),
+                               pickle.HIGHEST_PROTOCOL)
+        return b"".join([header, self.index_list.tobytes(), self.entry_hashes.tobytes(), payload])
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, fingerprint, max_len, size, n, typecode, order = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("not a Dict.to_bytes dump")
+        view = memoryview(data)
+        offset = _HEADER.size
+        index_list = array(typecode.decode())
+        end = offset + max_len * index_list.itemsize
+        index_list.frombytes(view[offset:end])
+        entry_hashes = array("q")
+        offset, end = end, end + n * entry_hashes.itemsize
+        entry_hashes.frombytes(view[offset:end])
+        if order.decode() != sys.byteorder[0]:
+            index_list.byteswap()
+            entry_hashes.byteswap()
+        entry_keys, entry_values, compact_ratio, shrink_ratio = pickle.loads(view[end:])
+
+        d = cls(compact_ratio=compact_ratio, shrink_ratio=shrink_ratio)
+        d.entry_hashes = entry_hashes
+        d.entry_keys = entry_keys
+        d.entry_values = entry_values
+        d.size = size
+        if fingerprint != _hash_fingerprint():
+            d.max_len = max_len
+            d._rehash()
+        elif cls is Dict:
+            d.index_list = index_list
+            d.max_len = max_len
+        else:
+            # Other backends keep their own tables; build them from the stored hashes
+            d._resize(max_len)
+        return d
+
+    def stats(self):
+        """
+        Load, tombstones and, while dict_stats.enable() is on, probe length
+        histograms, resizes and key comparisons, as a JSON-ready dict
+        """
+        from dict_stats import stats_of
+        return stats_of(self)
+
+    def freeze(self):
+        """Immutable copy of the current items with one-probe lookups"""
+        from frozen_dict import FrozenDict
+        return FrozenDict(self)
 
     def keys(self):
-        return [di.key for di in self.entries if not di.is_deleted]
+        return DictKeys(self)
 
     def values(self):
-        return [di.value for di in self.entries if not di.is_deleted]
+        return DictValues(self)
 
     def items(self):
-        return [(di.key, di.value) for di in self.entries if not di.is_deleted]
+        return DictItems(self)
@@ -1,6 +1,19 @@
 """
 Python clone of CPython implementation of python dictionary
+
+Append-only arena version: there is no delete, and entries are never moved,
+nor their keys and values changed, once written. They live in preallocated chunks of CHUNK_SIZE, so
+growing only rebuilds the index table. Setting an existing key appends a new
+version of its entry and links it from the old one.
+
+That makes snapshot() free: a Snapshot keeps references to the current
+chunks and index and the current entry count, and ignores everything
+written after it.
 """
+from sys import hash_info
+
+CHUNK_SIZE = 1024
+HASH_MASK = (1 << hash_info.width) - 1  # hashes are probed as unsigned
 
 
 class DictItem:
@@ -8,24 +21,30 @@ class DictItem:
         self.key_hash = h
         self.key = k
         self.value = v
+        self.newer = None  # entry index of the next version of this key
+        self.latest = None  # entry index of the newest version, on first versions
+        self.is_update = False
 
 
-class Dict:
-    def __init__(self):
-        self.index_list = [None] * 8
-        self.entries = []
-        self.size = 0
-        self.max_len = 8
+class _Reader:
+    """Lookups and iteration shared by Dict and Snapshot"""
+
+    def _entry(self, ix):
+        return self.chunks[ix // CHUNK_SIZE][ix % CHUNK_SIZE]
 
     def _get_next_index(self, key_hash, k):
-        seed = key_hash
-        p = key_hash
+        # Slot of k and whether it is there. Slots pointing at entries past
+        # self.length were filled later, so they count as empty.
+        mask = self.max_len - 1
+        p = key_hash & HASH_MASK
+        seed = p
         c = 0
         while True:
-            possible_index = (5 * seed + 1 + p) % self.max_len
+            possible_index = (5 * seed + 1 + p) & mask
             actual_index = self.index_list[possible_index]
-            if actual_index:
-                if self.entries[actual_index].key == k:
+            if actual_index is not None and actual_index < self.length:
+                di = self._entry(actual_index)
+                if di.key_hash == key_hash and (di.key is k or di.key == k):
                     return possible_index, True
             else:
                 return possible_index, False
@@ -36,74 +55,136 @@ class Dict:
                 break
         raise Exception("Something's wrong")
 
-    def _resize(self, length):
-        self.index_list = [None] * length
-        self.max_len = length
-        old_entries = self.entries[:]
-        self.entries = []
-        self.size = 0
-        for di in old_entries:
-            self.__setitem__(di.key, di.value)
-
-    def _check_and_resize(self):
-        if self.size >= (self.max_len * 2) // 3:
-            self._resize(2 * self.max_len)
-
-    def __setitem__(self, k, v):
-        key_hash = hash(k)
-        idx, exists = self._get_next_index(key_hash, k)
-        actual_index = self.index_list[idx]
-        if exists:
-            self.entries[actual_index].value = v
-            return
-        di = DictItem(key_hash, k, v)
-        self.entries.append(di)
-        self.index_list[idx] = len(self.entries) - 1
-        self.size += 1
-        self._check_and_resize()
+    def _version(self, ix):
+        # Newest version of the entry at ix that this reader can see
+        di = self._entry(ix)
+        if di.latest is not None and di.latest < self.length:
+            return self._entry(di.latest)
+        while di.newer is not None and di.newer < self.length:
+            di = self._entry(di.newer)
+        return di
 
     def __getitem__(self, k):
         key_hash = hash(k)
         idx, exists = self._get_next_index(key_hash, k)
-        actual_index = self.index_list[idx]
         if exists:
-            return self.entries[actual_index].value
+            return self._version(self.index_list[idx]).value
         raise KeyError(k)
-    
+
     def __len__(self):
         return self.size
-    
+
     def __repr__(self):
         repr = ""
         for k, v in self.items():
             repr += f"{k} - {v}\n"
         return repr
-    
+
     def __str__(self):
         return self.__repr__()
-    
+
     def __contains__(self, k):
-        try:
-            self.__getitem__(k)
-            return True
-        except KeyError:
-            return False
-        
+        return self._get_next_index(hash(k), k)[1]
+
+    def _iter_entries(self):
+        # Keys in first-insertion order, each with its newest visible value
+        for ix in range(self.length):
+            di = self._entry(ix)
+            if not di.is_update:
+                yield self._version(ix)
+
     def __iter__(self):
-        for di in self.entries:
+        for di in self._iter_entries():
             yield di.key
 
     def get(self, k, optional=None):
         try:
             return self.__getitem__(k)
         except KeyError:
-            return None
+            return optional
 
     def keys(self):
-        return [di.key for di in self.entries]
+        return [di.key for di in self._iter_entries()]
 
     def values(self):
-        return [di.value for di in self.entries]
+        return [di.value for di in self._iter_entries()]
 
     def items(self):
-        return [(di.key, di.value) for di in self.entries]
+        return [(di.key, di.value) for di in self._iter_entries()]
+
+
+class Snapshot(_Reader):
+    """Read-only view of a Dict as it was when snapshot() was called"""
+
+    def __init__(self, d):
+        self.chunks = d.chunks
+        self.index_list = d.index_list
+        self.max_len = d.max_len
+        self.length = d.length
+        self.size = d.size
+
+
+class Dict(_Reader):
+    def __init__(self):
+        self.index_list = [None] * 8
+        self.chunks = []
+        self.length = 0  # entries written
+        self.size = 0  # distinct keys
+        self.max_len = 8
+
+    def _append(self, di):
+        # Chunks are filled in place and never reallocated
+        if self.length == len(self.chunks) * CHUNK_SIZE:
+            self.chunks.append([None] * CHUNK_SIZE)
+        self.chunks[-1][self.length % CHUNK_SIZE] = di
+        self.length += 1
+        return self.length - 1
+
+    def _resize(self, length):
+        # Only the index is rebuilt; entry indices don't change. Swapping in
+        # the new list at the end leaves snapshots on the old one untouched.
+        old_index = self.index_list
+        self.index_list = [None] * length
+        self.max_len = length
+        mask = length - 1
+        for actual_index in old_index:
+            if actual_index is None:
+                continue
+            # Keys are distinct, so this only needs the first free slot
+            p = self._entry(actual_index).key_hash & HASH_MASK
+            seed = p
+            while True:
+                possible_index = (5 * seed + 1 + p) & mask
+                if self.index_list[possible_index] is None:
+                    break
+                seed = possible_index
+                p >>= 5
+            self.index_list[possible_index] = actual_index
+
+    def _check_and_resize(self):
+        if self.size >= (self.max_len * 2) // 3:
+            self._resize(2 * self.max_len)
+
+    def __setitem__(self, k, v):
+        key_hash = hash(k)
+        idx, exists = self._get_next_index(key_hash, k)
+        if exists:
+            first = self._entry(self.index_list[idx])
+            di = DictItem(key_hash, k, v)
+            di.is_update = True
+            ix = self._append(di)
+            newest = self._entry(first.latest) if first.latest is not None else first
+            newest.newer = ix
+            first.latest = ix
+            return
+        # Write the entry before the index slot that points at it, so a
+        # reader never finds a slot without its entry
+        ix = self._append(DictItem(key_hash, k, v))
+        self.index_list[idx] = ix
+        self.size += 1
+        self._check_and_resize()
+
+    def snapshot(self):
+        """Read-only view of the current contents, made without copying"""
+        return Snapshot(self)
+
@@ -0,0 +1,189 @@
+"""
+Immutable dictionary over a minimal perfect hash (hash and displace, CHD style)
+
+Keys are spread over buckets by one hash. Buckets are then placed largest
+first: each gets the smallest seed that sends all of its keys to free slots
+of an n slot table, and single key buckets simply take a free slot, stored as
+a negative seed. A lookup is bucket -> seed -> slot, then one key comparison;
+there is no collision loop.
+
+Keys with the same full hash can't be told apart by any function of that
+hash, so all but one of them go to a small overflow Dict checked on a miss
+(and iterated after the table's keys).
+"""
+from array import array
+
+from dictionary import Dict, DictItems, DictKeys, DictValues, DELETED, _index_typecode
+
+_M64 = (1 << 64) - 1
+
+
+def _bucket(key_hash, n):
+    # Tuple hashing (xxHash based) mixes the key hash in C
+    return hash((key_hash, 0)) % n
+
+
+def _slot(key_hash, seed, n):
+    # splitmix64-style finalizer; unlike tuple hashing, nearby seeds give
+    # unrelated slots, which the seed search depends on
+    x = (((key_hash & _M64) ^ (seed * 0x9E3779B97F4A7C15)) * 0xBF58476D1CE4E5B9) & _M64
+    return (x ^ (x >> 31)) % n
+
+
+class FrozenDict:
+    # Buckets per key. Most keys then sit alone in their bucket and resolve
+    # without the seeded hash, for a few bytes of seeds per key.
+    bucket_ratio = 4
+
+    __slots__ = ("n_slots", "seeds", "slot_hashes", "slot_keys", "slot_values", "order", "overflow", "_hash")
+
+    def __init__(self, items=()):
+        d = items if isinstance(items, Dict) else Dict.from_items(items.items() if hasattr(items, "items") else items)
+        # The first key seen for each full hash goes in the table, the rest overflow
+        primary = []
+        seen = set()
+        overflow = Dict()
+        for key_hash, k, v in zip(d.entry_hashes, d.entry_keys, d.entry_values):
+            if k is DELETED:
+                continue
+            if key_hash in seen:
+                overflow[k] = v
+            else:
+                seen.add(key_hash)
+                primary.append((key_hash, k, v))
+
+        n = len(primary)
+        hashes = [key_hash for key_hash, _, _ in primary]
+        n_buckets = self.bucket_ratio * n
+        buckets = [[] for _ in range(n_buckets)]
+        for i, key_hash in enumerate(hashes):
+            buckets[_bucket(key_hash, n_buckets)].append(i)
+
+        seeds = [0] * n_buckets
+        slot_of = [0] * n
+        taken = bytearray(n)
+        singles = []
+        for b in sorted(range(n_buckets), key=lambda b: len(buckets[b]), reverse=True):
+            bucket = buckets[b]
+            if len(bucket) <= 1:
+                if bucket:
+                    singles.append(b)
+                continue
+            seed = 1
+            while True:
+                slots = [_slot(hashes[i], seed, n) for i in bucket]
+                if len(set(slots)) == len(slots) and not any(taken[s] for s in slots):
+                    break
+                seed += 1
+            seeds[b] = seed
+            for i, s in zip(bucket, slots):
+                taken[s] = 1
+                slot_of[i] = s
+        free = (s for s in range(n) if not taken[s])
+        for b in singles:
+            s = next(free)
+            seeds[b] = -s - 1
+            slot_of[buckets[b][0]] = s
+
+        slot_hashes = array("q", [0]) * n
+        slot_keys = [None] * n
+        slot_values = [None] * n
+        for (key_hash, k, v), s in zip(primary, slot_of):
+            slot_hashes[s] = key_hash
+            slot_keys[s] = k
+            slot_values[s] = v
+
+        self.n_slots = n
+        self.seeds = array(_index_typecode(max([n + 1] + seeds)), seeds)
+        self.slot_hashes = slot_hashes
+        self.slot_keys = tuple(slot_keys)
+        self.slot_values = tuple(slot_values)
+        self.order = array(_index_typecode(n), slot_of)  # slots in insertion order
+        self.overflow = overflow if len(overflow) else None
+        self._hash = None
+
+    def __getitem__(self, k):
+        n = self.n_slots
+        if n:
+            key_hash = hash(k)
+            # _bucket and _slot, inlined
+            s = self.seeds[hash((key_hash, 0)) % len(self.seeds)]
+            if s < 0:
+                s = -s - 1
+            else:
+                x = (((key_hash & _M64) ^ (s * 0x9E3779B97F4A7C15)) * 0xBF58476D1CE4E5B9) & _M64
+                s = (x ^ (x >> 31)) % n
+            if self.slot_hashes[s] == key_hash:
+                key = self.slot_keys[s]
+                if key is k or key == k:
+                    return self.slot_values[s]
+            if self.overflow is not None:
+                return self.overflow[k]
+        raise KeyError(k)
+
+    def __contains__(self, k):
+        try:
+            self.__getitem__(k)
+            return True
+        except KeyError:
+            return False
+
+    def get(self, k, optional=None):
+        try:
+            return self.__getitem__(k)
+        except KeyError:
+            return optional
+
+    def __len__(self):
+        return self.n_slots + (len(self.overflow) if self.overflow is not None else 0)
+
+    def __hash__(self):
+        # Computed once; like tuple, raises TypeError for unhashable values
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
+    def __eq__(self, other):
+        if not hasattr(other, "items"):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        for k, v in other.items():
+            try:
+                if self[k] != v:
+                    return False
+            except KeyError:
+                return False
+        return True
+
+    def __repr__(self):
+        return "".join([f"{k} - {v}\n" for k, v in self.items()])
+
+    def __str__(self):
+        return self.__repr__()
+
+    def _iter_items(self):
+        for s in self.order:
+            yield self.slot_keys[s], self.slot_values[s]
+        if self.overflow is not None:
+            yield from self.overflow._iter_items()
+
+    def _iter_keys(self):
+        for k, _ in self._iter_items():
+            yield k
+
+    def _iter_values(self):
+        for _, v in self._iter_items():
+            yield v
+
+    def __iter__(self):
+        return self._iter_keys()
+
+    def keys(self):
+        return DictKeys(self)
+
+    def values(self):
+        return DictValues(self)
+
+    def items(self):
+        return DictItems(self)
@@ -0,0 +1,286 @@
+"""
+Dict backend that defends itself against chosen-collision keys
+
+Dict probes with hash(k), so keys picked to collide (ints that share their
+low bits, ints a multiple of the 2**61 - 1 modulus apart, objects with a
+weak __hash__) pile up in one probe chain and make every operation O(n).
+
+HardenedDict counts the probes of each insert. Once one takes more than
+max_probes it reacts, depending on what the chain was made of:
+
+  - distinct hashes that only share their low bits: the table switches to
+    a keyed hash, blake2b with a random per-table key, of the str/bytes
+    contents or of hash(k) for other keys, and rehashes everything. The
+    attacker no longer knows where any key goes.
+  - bucket_min or more keys with the very same hash, which no function of
+    hash(k) can pull apart: those keys move out of the index into an
+    ordered bucket for that hash, a sorted list searched with bisect (or
+    scanned, if the keys don't order), much as Java's HashMap turns a long
+    bin into a tree.
+"""
+import os
+from bisect import bisect_left
+from hashlib import blake2b
+
+from dictionary import Dict, DELETED, DUMMY, EMPTY, HASH_MASK, PERTURB_SHIFT, _as_int_array, _new_index, \
+    np
+
+BUCKET = -3  # slot returned by _lookup for keys kept in a bucket
+
+
+def _keyed_hash(k, seed):
+    t = type(k)
+    if t is str:
+        data = k.encode("utf-8", "surrogatepass")
+    elif t is bytes:
+        data = k
+    else:
+        # Equal keys must hash equal (1 == 1.0 == True), so other types
+        # go through hash(k)
+        data = hash(k).to_bytes(8, "little", signed=True)
+    return int.from_bytes(blake2b(data, digest_size=8, key=seed).digest(), "little", signed=True)
+
+
+class _Bucket:
+    """Entries sharing one full hash, sorted by key while the keys allow it"""
+
+    def __init__(self):
+        self.keys = []
+        self.ixs = []
+        self.ordered = True
+
+    def _position(self, k):
+        keys = self.keys
+        if self.ordered:
+            try:
+                j = bisect_left(keys, k)
+            except TypeError:
+                self.ordered = False
+            else:
+                return j if j < len(keys) and keys[j] == k else -1
+        for j, key in enumerate(keys):
+            if key is k or key == k:
+                return j
+        return -1
+
+    def find(self, k):
+        j = self._position(k)
+        return self.ixs[j] if j >= 0 else EMPTY
+
+    def add(self, k, ix):
+        if self.ordered:
+            try:
+                j = bisect_left(self.keys, k)
+            except TypeError:
+                self.ordered = False
+            else:
+                self.keys.insert(j, k)
+                self.ixs.insert(j, ix)
+                return
+        self.keys.append(k)
+        self.ixs.append(ix)
+
+    def remove(self, k):
+        j = self._position(k)
+        del self.keys[j]
+        del self.ixs[j]
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class HardenedDict(Dict):
+    max_probes = 32  # an insert probing longer than this looks like an attack
+    bucket_min = 8  # keys with one hash in such a chain that get a bucket
+
+    def __init__(self, capacity=0, **kwargs):
+        self.seed = None  # blake2b key, once hashing is keyed
+        self.buckets = Dict()  # full hash -> _Bucket
+        self._probes = 0  # probes and equal hashes seen by the last _lookup
+        self._same_hash = 0
+        super().__init__(capacity, **kwargs)
+
+    def _hash(self, k):
+        if self.seed is None:
+            return hash(k)
+        return _keyed_hash(k, self.seed)
+
+    def _lookup(self, key_hash, k):
+        if self.buckets.size:  # len() would cost a method call per lookup
+            bucket = self.buckets.get(key_hash)
+            if bucket is not None:
+                return BUCKET, bucket.find(k)
+        index_list = self.index_list
+        mask = self.max_len - 1
+        perturb = key_hash & HASH_MASK
+        i = perturb & mask
+        probes = 1
+        same = 0
+        while True:
+            ix = index_list[i]
+            if ix == EMPTY:
+                break
+            if ix >= 0 and self.entry_hashes[ix] == key_hash:
+                key = self.entry_keys[ix]
+                if key is k or key == k:
+                    break
+                same += 1
+            perturb >>= PERTURB_SHIFT
+            i = (5 * i + perturb + 1) & mask
+            probes += 1
+        self._probes = probes
+        self._same_hash = same
+        return i, ix
+
+    def _harden(self, key_hash):
+        # Called after an insert that took more than max_probes
+        if self._same_hash + 1 >= self.bucket_min:
+            self._make_bucket(key_hash)
+        elif self.seed is None:
+            self.seed = os.urandom(16)
+            self._rehash()
+
+    def _make_bucket(self, key_hash):
+        bucket = _Bucket()
+        for ix, (h, k) in enumerate(zip(self.entry_hashes, self.entry_keys)):
+            if h == key_hash and k is not DELETED:
+                self.index_list[self._slot_of(key_hash, ix)] = DUMMY
+                bucket.add(k, ix)
+        self.buckets[key_hash] = bucket
+
+    def _slot_of(self, key_hash, ix):
+        index_list = self.index_list
+        mask = self.max_len - 1
+        perturb = key_hash & HASH_MASK
+        i = perturb & mask
+        while index_list[i] != ix:
+            perturb >>= PERTURB_SHIFT
+            i = (5 * i + perturb + 1) & mask
+        return i
+
+    def _resize(self, length):
+        # Dict._resize, leaving the keys of bucketed hashes out of the index
+        old_hashes = self.entry_hashes
+        old_keys = self.entry_keys
+        old_values = self.entry_values
+        bucketed = self.buckets
+        self.version += 1
+        self.index_list = _new_index(length)
+        self.max_len = length
+        self.entry_hashes = old_hashes[:0]
+        self.entry_keys = []
+        self.entry_values = []
+        self.buckets = Dict()
+        for i, k in enumerate(old_keys):
+            if k is DELETED:
+                continue
+            key_hash = old_hashes[i]
+            ix = len(self.entry_keys)
+            if key_hash in bucketed:
+                bucket = self.buckets.get(key_hash)
+                if bucket is None:
+                    bucket = self.buckets[key_hash] = _Bucket()
+                bucket.add(k, ix)
+            else:
+                self.index_list[self._find_empty_slot(key_hash)] = ix
+            self.entry_hashes.append(key_hash)
+            self.entry_keys.append(k)
+            self.entry_values.append(old_values[i])
+
+    def _rehash(self):
+        # Bucketed keys keep their buckets under their new hashes
+        bucketed = Dict.fromkeys(self._hash(k) for k, h in zip(self.entry_keys, self.entry_hashes)
+                                 if k is not DELETED and h in self.buckets)
+        self.entry_hashes = self.entry_hashes[:0]
+        self.entry_hashes.extend(0 if k is DELETED else self._hash(k) for k in self.entry_keys)
+        self.buckets = bucketed
+        self._resize(self.max_len)
+
+    def _add_entry(self, idx, key_hash, k, v):
+        ix = len(self.entry_keys)
+        if idx == BUCKET:
+            self.buckets[key_hash].add(k, ix)
+        else:
+            self.index_list[idx] = ix
+        self.entry_hashes.append(key_hash)
+        self.entry_keys.append(k)
+        self.entry_values.append(v)
+        self.size += 1
+        self.version += 1
+        if self._probes > self.max_probes and idx != BUCKET:
+            self._harden(key_hash)
+
+    def _insert_many(self, items):
+        # Hashed lazily, so keys after a switch to keyed hashing get keyed hashes
+        self._insert_hashed((self._hash(k), k, v) for k, v in items)
+
+    def _insert_hashed(self, entries):
+        for key_hash, k, v in entries:
+            idx, ix = self._lookup(key_hash, k)
+            if ix >= 0:
+                self.entry_values[ix] = v
+                continue
+            self._add_entry(idx, key_hash, k, v)
+
+    def __setitem__(self, k, v):
+        key_hash = self._hash(k)
+        idx, ix = self._lookup(key_hash, k)
+        if ix >= 0:
+            self.entry_values[ix] = v
+            return
+        self._add_entry(idx, key_hash, k, v)
+        self._check_and_resize()
+
+    def __getitem__(self, k):
+        idx, ix = self._lookup(self._hash(k), k)
+        if ix >= 0:
+            return self.entry_values[ix]
+        raise KeyError(k)
+
+    def get(self, k, optional=None):
+        idx, ix = self._lookup(self._hash(k), k)
+        if ix >= 0:
+            return self.entry_values[ix]
+        return optional
+
+    def __contains__(self, k):
+        return self._lookup(self._hash(k), k)[1] >= 0
+
+    def __delitem__(self, k):
+        key_hash = self._hash(k)
+        idx, ix = self._lookup(key_hash, k)
+        if ix < 0:
+            raise KeyError(k)
+        if idx == BUCKET:
+            bucket = self.buckets[key_hash]
+            bucket.remove(k)
+            if not bucket:
+                del self.buckets[key_hash]
+        else:
+            self.index_list[idx] = DUMMY
+        self.entry_keys[ix] = DELETED
+        self.entry_values[ix] = None
+        self.size -= 1
+        self.version += 1
+        self._check_and_compact()
+
+    def _lookup_many(self, keys, hashes):
+        # The batch hashes are hash(k); a keyed table needs its own
+        return np.fromiter((self._lookup(self._hash(k), k)[1] for k in keys.tolist()),
+                           dtype=np.int64, count=len(keys))
+
+    def set_many(self, keys, values):
+        # Dict's version inserts with the batch's hash(k) values
+        batch = _as_int_array(keys)
+        keys = list(keys) if batch is None else batch.tolist()
+        values = list(values)
+        if len(values) != len(keys):
+            raise ValueError("keys and values must have the same length")
+        self.update(zip(keys, values))
+
+    @classmethod
+    def from_bytes(cls, data):
+        # The dump's hashes may be keyed with another table's seed
+        d = super().from_bytes(data)
+        d._rehash()
+        return d
@@ -0,0 +1,201 @@
+"""
+Dict that spreads resizes over the following operations instead of
+rebuilding the whole table at once (the way Redis rehashes its dicts)
+
+While a resize is in flight the old and new index tables live side by side.
+Every get/set/delete first moves a few entries into the new table, sliding
+them down over deleted entries as it goes, and lookups that miss the new
+table fall back to the old one.
+"""
+from dictionary import Dict, DELETED, DUMMY, EMPTY, HASH_MASK, PERTURB_SHIFT, _new_index
+
+
+class IncrementalDict(Dict):
+    migrate_step = 8  # entries moved per operation while resizing
+
+    def __init__(self, capacity=0, **kwargs):
+        super().__init__(capacity, **kwargs)
+        self.old_index = None
+        self.old_max_len = 0
+        self.old_end = 0  # entries below this are indexed by old_index
+        self.migrate_pos = 0  # next entry to move into the new table
+        self.write_pos = 0  # where that entry is moved to
+        self.new_fill = 0  # used slots in the new table
+
+    @property
+    def is_migrating(self):
+        return self.old_index is not None
+
+    def _start_migration(self, length):
+        self.old_index = self.index_list
+        self.old_max_len = self.max_len
+        self.old_end = len(self.entry_keys)
+        self.index_list = _new_index(length)
+        self.max_len = length
+        self.migrate_pos = 0
+        self.write_pos = 0
+        self.new_fill = 0
+        self.version += 1
+
+    def _find_slot_of(self, key_hash, ix):
+        # Slot of the new table that points at entry ix
+        index_list = self.index_list
+        mask = self.max_len - 1
+        perturb = key_hash & HASH_MASK
+        i = perturb & mask
+        while index_list[i] != ix:
+            perturb >>= PERTURB_SHIFT
+            i = (5 * i + perturb + 1) & mask
+        return i
+
+    def _migrate(self, n):
+        hashes = self.entry_hashes
+        keys = self.entry_keys
+        values = self.entry_values
+        r = self.migrate_pos
+        w = self.write_pos
+        while n > 0 and r < len(keys):
+            k = keys[r]
+            if k is not DELETED:
+                key_hash = hashes[r]
+                if r < self.old_end:
+                    self.index_list[self._find_empty_slot(key_hash)] = w
+                    self.new_fill += 1
+                elif r != w:
+                    # Inserted after the resize began, already in the new table
+                    self.index_list[self._find_slot_of(key_hash, r)] = w
+                if r != w:
+                    hashes[w] = key_hash
+                    keys[w] = k
+                    values[w] = values[r]
+                    keys[r] = DELETED
+                    values[r] = None
+                w += 1
+                n -= 1
+            r += 1
+        self.migrate_pos = r
+        self.write_pos = w
+        self._head = None  # entries moved down, maybe below it
+        if r == len(keys):
+            del hashes[w:]
+            del keys[w:]
+            del values[w:]
+            self.old_index = None
+
+    def _finish_migration(self):
+        self._migrate(len(self.entry_keys))
+
+    def _lookup_old(self, key_hash, k):
+        index_list = self.old_index
+        mask = self.old_max_len - 1
+        perturb = key_hash & HASH_MASK
+        i = perturb & mask
+        while True:
+            ix = index_list[i]
+            if ix == EMPTY:
+                return i, EMPTY
+            # Entries below migrate_pos have already moved to the new table
+            if ix >= self.migrate_pos and self.entry_hashes[ix] == key_hash:
+                key = self.entry_keys[ix]
+                if key is k or key == k:
+                    return i, ix
+            perturb >>= PERTURB_SHIFT
+            i = (5 * i + perturb + 1) & mask
+
+    def _lookup(self, key_hash, k):
+        if self.old_index is not None:
+            self._migrate(self.migrate_step)
+        idx, ix = super()._lookup(key_hash, k)
+        if ix == EMPTY and self.old_index is not None:
+            old_ix = self._lookup_old(key_hash, k)[1]
+            if old_ix >= 0:
+                return EMPTY, old_ix
+        return idx, ix
+
+    def _check_and_resize(self):
+        if self.old_index is not None:
+            if self.new_fill < (self.max_len * 2) // 3:
+                return
+            self._finish_migration()
+        if len(self.entry_keys) >= (self.max_len * 2) // 3:
+            self._start_migration(self._grown_length())
+
+    def _check_and_compact(self):
+        # A migration compacts as it goes, so it doubles as the rebuild
+        if self.old_index is None:
+            length = self._compacted_length()
+            if length:
+                self._start_migration(length)
+
+    # Lookups would otherwise move entries under a running iterator, so
+    # iteration finishes any migration up front; it is O(n) either way.
+    def _iter_keys(self):
+        if self.old_index is not None:
+            self._finish_migration()
+        return super()._iter_keys()
+
+    def _iter_values(self):
+        if self.old_index is not None:
+            self._finish_migration()
+        return super()._iter_values()
+
+    def _iter_items(self):
+        if self.old_index is not None:
+            self._finish_migration()
+        return super()._iter_items()
+
+    def _lookup_many(self, keys, hashes):
+        # The batch probe only knows one table
+        if self.old_index is not None:
+            self._finish_migration()
+        return super()._lookup_many(keys, hashes)
+
+    def _reserve(self, n):
+        # Bulk loads rebuild in one pass, they pay for the whole input anyway
+        if self.old_index is not None:
+            self._finish_migration()
+        super()._reserve(n)
+
+    def _trim_entries(self):
+        # The migration's positions count on the entry arrays' length
+        if self.old_index is None:
+            super()._trim_entries()
+
+    def __getstate__(self):
+        # Dumps are never taken mid-migration
+        if self.old_index is not None:
+            self._finish_migration()
+        return super().__getstate__()
+
+    def __setitem__(self, k, v):
+        key_hash = hash(k)
+        idx, ix = self._lookup(key_hash, k)
+        if ix >= 0:
+            self.entry_values[ix] = v
+            return
+
+        self.index_list[idx] = len(self.entry_keys)
+        self.entry_hashes.append(key_hash)
+        self.entry_keys.append(k)
+        self.entry_values.append(v)
+        self.size += 1
+        self.version += 1
+        self.new_fill += 1
+        self._check_and_resize()
+
+    def __delitem__(self, k):
+        key_hash = hash(k)
+        idx, ix = self._lookup(key_hash, k)
+        if ix < 0:
+            raise KeyError(k)
+        if idx == EMPTY:
+            # Not migrated yet, the old table still points at it
+            idx = self._lookup_old(key_hash, k)[0]
+            self.old_index[idx] = DUMMY
+        else:
+            self.index_list[idx] = DUMMY
+        self.entry_keys[ix] = DELETED
+        self.entry_values[ix] = None
+        self.size -= 1
+        self.version += 1
+        self._check_and_compact()
@@ -0,0 +1,82 @@
+"""
+Least recently used cache on top of Dict's insertion-ordered entries
+
+The entry arrays already keep keys in the order they were added. A hit
+moves its key to the newest end by pointing the key's index slot at a
+fresh copy of the entry and deleting the old one, so the oldest live entry
+is always the least recently used, and evicting it is popitem(last=False).
+Both are O(1) amortized: the deleted entries left behind are cleared out
+by Dict's ordinary rebuilds.
+"""
+from dictionary import Dict, DELETED
+
+
+class LRUDict(Dict):
+    def __init__(self, maxsize=128, **kwargs):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        super().__init__(**kwargs)
+
+    def _touch(self, idx, ix):
+        # Make entry ix, found at slot idx, the newest
+        keys = self.entry_keys
+        if ix == len(keys) - 1:
+            return
+        self.index_list[idx] = len(keys)
+        self.entry_hashes.append(self.entry_hashes[ix])
+        keys.append(keys[ix])
+        self.entry_values.append(self.entry_values[ix])
+        keys[ix] = DELETED
+        self.entry_values[ix] = None
+        self.version += 1
+        self._check_and_resize()
+
+    def __getitem__(self, k):
+        idx, ix = self._lookup(hash(k), k)
+        if ix < 0:
+            self.misses += 1
+            raise KeyError(k)
+        self.hits += 1
+        v = self.entry_values[ix]
+        self._touch(idx, ix)
+        return v
+
+    def get(self, k, optional=None):
+        idx, ix = self._lookup(hash(k), k)
+        if ix < 0:
+            self.misses += 1
+            return optional
+        self.hits += 1
+        v = self.entry_values[ix]
+        self._touch(idx, ix)
+        return v
+
+    def __setitem__(self, k, v):
+        key_hash = hash(k)
+        idx, ix = self._lookup(key_hash, k)
+        if ix >= 0:
+            self.entry_values[ix] = v
+            self._touch(idx, ix)
+            return
+
+        self.index_list[idx] = len(self.entry_keys)
+        self.entry_hashes.append(key_hash)
+        self.entry_keys.append(k)
+        self.entry_values.append(v)
+        self.size += 1
+        self.version += 1
+        self._check_and_resize()
+        if self.size > self.maxsize:
+            self.popitem(last=False)
+
+    def _insert_hashed(self, entries):
+        # One at a time, so bulk loads evict too
+        for _, k, v in entries:
+            self[k] = v
+
+    def cache_info(self):
+        """Hits, misses and size, like functools.lru_cache's cache_info()"""
+        return {"hits": self.hits, "misses": self.misses, "maxsize": self.maxsize, "currsize": self.size}
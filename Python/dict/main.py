@@ -1,6 +1,30 @@
+import json
+import os
+import tempfile
+import pickle
+import random
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+import multiprocessing
 from time import perf_counter_ns
 from timeit import timeit
-from dictionary import Dict
+import tracemalloc
+from dictionary import Dict, DUMMY, EMPTY, HASH_MASK, PERTURB_SHIFT, np
+import dictionary_without_delete
+from incremental_dict import IncrementalDict
+from split_dict import SharedKeys, SplitDict
+from robin_hood_dict import RobinHoodDict
+import dict_stats
+import benchmark
+import mmap_dict
+from concurrent_dict import ConcurrentDict
+from shared_dict import SharedDict
+from cow_dict import CowDict
+from bloom_dict import BloomDict
+from hardened_dict import HardenedDict
+from lru_dict import LRUDict
 
 def test_basic_functionality():
     t1 = perf_counter_ns()
@@ -37,44 +61,609 @@ def test_basic_functionality():
 
     print("Total time in ns by dict: ", td)
     print("Total time in ns by our dict: ", ta)
-    print("Difference in ns: time taken by dict - time taken by Dict = ", td)
+    print("Difference in ns: time taken by dict - time taken by Dict = ", td - ta)
 
 
 def analyse_timing():
-    ad = timeit(
+    # The full suite, with JSON output and run comparison, is benchmark.py
+    benchmark.run_suite([1000], list(benchmark.IMPLEMENTATIONS), list(benchmark.WORKLOADS), memory=False)
+
+
+def _traced_bytes(build):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        table = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return table, after - before
+
+
+def memory_report(n=100000):
+    # Keys and values are created up front so only the table itself is measured
+    keys = list(range(n))
+    values = [str(i) for i in keys]
+
+    def fill(cls):
+        def build():
+            d = cls()
+            for k, v in zip(keys, values):
+                d[k] = v
+            return d
+        return build
+
+    _, compact = _traced_bytes(fill(Dict))
+    _, legacy = _traced_bytes(fill(dictionary_without_delete.Dict))
+    _, builtin = _traced_bytes(fill(dict))
+
+    print(f"Memory for {n} entries (bytes per entry)")
+    print("Compact arrays (dictionary.Dict): ", round(compact / n, 1))
+    print("DictItem objects (dictionary_without_delete.Dict): ", round(legacy / n, 1))
+    print("Builtin dict: ", round(builtin / n, 1))
+
+
+class CountingKey:
+    """Key with a chosen hash that counts how often __eq__ runs"""
+    eq_calls = 0
+
+    def __init__(self, val, hash_val):
+        self.val = val
+        self.hash_val = hash_val
+
+    def __hash__(self):
+        return self.hash_val
+
+    def __eq__(self, other):
+        CountingKey.eq_calls += 1
+        return isinstance(other, CountingKey) and self.val == other.val
+
+
+class OldProbingDict(Dict):
+    """Dict driven by the generator probe sequence it used before, for comparison"""
+
+    def _get_next_index(self, key_hash, k):
+        seed = key_hash
+        p = key_hash
+        c = 0
+        while True:
+            possible_index = (5 * seed + 1 + p) % self.max_len
+            actual_index = self.index_list[possible_index]
+            if actual_index == DUMMY:
+                yield possible_index, False, True
+            elif actual_index != EMPTY:
+                if self.entry_keys[actual_index] == k:
+                    yield possible_index, True, False
+            else:
+                yield possible_index, False, False
+            seed = possible_index
+            p >>= 5
+            c += 1
+            if c >= self.max_len:
+                raise RuntimeError("Something's wrong - Dict might be full")
+
+    def _lookup(self, key_hash, k):
+        for idx, exists, is_tomb in self._get_next_index(key_hash, k):
+            if not is_tomb:
+                break
+        return idx, self.index_list[idx] if exists else EMPTY
+
+    def _find_empty_slot(self, key_hash):
+        return self._lookup(key_hash, DUMMY)[0]
+
+
+def analyse_probing(n=2000):
+    key_sets = {
+        # hashes differ but share their low bits, so every key lands in one chain
+        "same low bits": [CountingKey(i, i << 16) for i in range(n)],
+        # the 1, 9, 17 pattern from test_dict.py
+        "stride of 8": [CountingKey(i, 1 + 8 * i) for i in range(n)],
+        # a handful of fully colliding hashes
+        "10 hash values": [CountingKey(i, i % 10) for i in range(n // 10)],
+    }
+    for name, keys in key_sets.items():
+        for label, cls in (("Dict", Dict), ("old probing", OldProbingDict)):
+            CountingKey.eq_calls = 0
+            t1 = perf_counter_ns()
+            try:
+                d = cls()
+                for k in keys:
+                    d[k] = k.val
+                for k in keys:
+                    d[k]
+            except Exception as e:
+                print(f"{name:>15} | {label:>11} | failed: {e}")
+                continue
+            t2 = perf_counter_ns()
+            print(f"{name:>15} | {label:>11} | {(t2 - t1) / 1e6:8.2f} ms | __eq__ calls: {CountingKey.eq_calls}")
+
+
+def analyse_bulk_load(number=1000):
+    items = [(i, str(i)) for i in range(1000)]
+    loop = timeit(
         """
 d = Dict()
 for i in range(1000):
     d[i] = str(i)
-x = d[56]
-x = d[789]
-x = d.get(555555555)
-x = d.keys()
-x = d.values()
-x = d.items()
         """,
-        number=10000,
-        globals={
-            "Dict": Dict
-        }
+        number=number,
+        globals={"Dict": Dict}
     )
-
-    pd = timeit(
+    presized = timeit(
         """
-d = dict()
+d = Dict(capacity=1000)
 for i in range(1000):
     d[i] = str(i)
-d[56]
-d[789]
-d.get(555555555)
-d.keys()
-d.values()
-d.items()
         """,
-        number=10000
+        number=number,
+        globals={"Dict": Dict}
     )
+    bulk = timeit(lambda: Dict.from_items(items), number=number)
+
+    print("1000 keys, x", number)
+    print("Dict() + loop: ", loop, "Dict(capacity=1000) + loop: ", presized,
+          "Dict.from_items: ", bulk, "seconds")
+
+
+def analyse_latency(n=500000):
+    def percentile(samples, p):
+        return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+    print(f"Per insert latency in ns over {n} inserts")
+    for label, cls in (("Dict", Dict), ("IncrementalDict", IncrementalDict)):
+        d = cls()
+        samples = []
+        for i in range(n):
+            t1 = perf_counter_ns()
+            d[i] = i
+            t2 = perf_counter_ns()
+            samples.append(t2 - t1)
+        samples.sort()
+        print(f"{label:>15} | p50 {percentile(samples, 0.5):>8} | p99 {percentile(samples, 0.99):>8}"
+              f" | p999 {percentile(samples, 0.999):>8} | max {samples[-1]:>10}")
+
+
+def probe_lengths(d):
+    # Mean and worst slots visited to find a live key, following Dict's probe sequence
+    total = 0
+    worst = 0
+    for k in d:
+        mask = d.max_len - 1
+        perturb = hash(k) & HASH_MASK
+        i = perturb & mask
+        probes = 1
+        while d.index_list[i] < 0 or d.entry_keys[d.index_list[i]] is not k:
+            perturb >>= PERTURB_SHIFT
+            i = (5 * i + perturb + 1) & mask
+            probes += 1
+        total += probes
+        worst = max(worst, probes)
+    return total / max(len(d), 1), worst
+
+
+def mean_probe_length(d):
+    return probe_lengths(d)[0]
+
+
+def analyse_churn(live=10000, rounds=20):
+    print(f"Insert/delete churn, {live} live keys")
+    for label, kwargs in (("compaction on", {}), ("compaction off", {"compact_ratio": 0, "shrink_ratio": 0})):
+        d = Dict(**kwargs)
+        for i in range(live):
+            d[str(i)] = i
+        for r in range(1, rounds + 1):
+            for i in range(r * live, (r + 1) * live):
+                d[str(i)] = i
+                # delete in a scattered order so tombstones pile up mid-chain
+                if i % 2:
+                    del d[str(i - live)]
+            for i in range(r * live, (r + 1) * live, 2):
+                del d[str(i - live)]
+            if r % 5 == 0:
+                print(f"{label:>15} | round {r:>3} | max_len {d.max_len:>7} | entries {len(d.entry_keys):>7}"
+                      f" | tombstones {d.index_list.count(DUMMY):>6} | mean probe {mean_probe_length(d):.2f}")
+        # shrink once most keys are gone
+        for k in list(d)[: live - live // 100]:
+            del d[k]
+        print(f"{label:>15} | after deleting 99% | max_len {d.max_len:>7}")
+
+
+class HighLoadDict(Dict):
+    """Dict that only resizes at max_load, to compare with the other backends"""
+
+    def __init__(self, capacity=0, max_load=0.9, **kwargs):
+        self.max_load = max_load
+        super().__init__(capacity, **kwargs)
+
+    def _grown_length(self):
+        return self.max_len * 2
+
+    def _check_and_resize(self):
+        if len(self.entry_keys) >= int(self.max_len * self.max_load):
+            self._resize(self._grown_length())
+
+
+def analyse_robin_hood(n=58900, churn=5000):
+    # n keys fill a 65536 slot table to 0.9
+    print(f"Probe lengths at 0.9 load, {n} keys")
+    for label, d, lengths in (("Dict", HighLoadDict(), probe_lengths),
+                              ("RobinHoodDict", RobinHoodDict(max_load=0.9), RobinHoodDict.probe_lengths)):
+        for i in range(n):
+            d[str(i)] = i
+        mean, worst = lengths(d)
+        print(f"{label:>13} | load {len(d) / d.max_len:.2f} | mean {mean:5.2f} | worst {worst:>4}")
+        # delete and re-add, leaving tombstones in Dict's index
+        for i in range(0, 2 * churn, 2):
+            del d[str(i)]
+        for i in range(n, n + churn):
+            d[str(i)] = i
+        mean, worst = lengths(d)
+        print(f"{'after churn':>13} | load {len(d) / d.max_len:.2f} | mean {mean:5.2f} | worst {worst:>4}"
+              f" | index slots in use {sum(1 for ix in d.index_list if ix != EMPTY)}")
+
+
+def analyse_split_tables(n=100000):
+    fields = ("id", "name", "email", "age", "city")
+    rows = [(i, f"user{i}", f"user{i}@example.com", i % 90, "Chennai") for i in range(n)]
+    shared = SharedKeys()
+
+    def build(make):
+        def run():
+            records = []
+            for row in rows:
+                d = make()
+                for k, v in zip(fields, row):
+                    d[k] = v
+                records.append(d)
+            return records
+        return run
+
+    print(f"{n} records with {len(fields)} keys")
+    for label, make in (("Dict", Dict), ("SplitDict", lambda: SplitDict(shared)), ("dict", dict)):
+        run = build(make)
+        records, size = _traced_bytes(run)
+        t1 = perf_counter_ns()
+        run()
+        t2 = perf_counter_ns()
+        for d in records:
+            for k in fields:
+                d[k]
+        t3 = perf_counter_ns()
+        print(f"{label:>10} | {size / n:7.1f} bytes per record | build {(t2 - t1) / 1e6:8.1f} ms"
+              f" | read all {(t3 - t2) / 1e6:8.1f} ms")
+
+
+def analyse_frozen_lookups(n=100000, number=5):
+    key_sets = {
+        "str keys": [f"key{i}" for i in range(n)],
+        # shared low bits make long probe chains in Dict
+        "int keys << 20": [i << 20 for i in range(n)],
+    }
+    for name, keys in key_sets.items():
+        d = Dict.from_items((k, i) for i, k in enumerate(keys))
+        t1 = perf_counter_ns()
+        f = d.freeze()
+        t2 = perf_counter_ns()
+        builtin = dict(zip(keys, range(n)))
+        print(f"{n} {name}, FrozenDict built in {(t2 - t1) / 1e6:.1f} ms")
+        for label, table in (("Dict", d), ("FrozenDict", f), ("dict", builtin)):
+            seconds = timeit(lambda: [table[k] for k in keys], number=number)
+            print(f"{label:>10} | {n * number / seconds / 1e6:6.2f} M lookups/s")
+
+
+def analyse_batch(n=100000, batch=100000):
+    d = Dict.from_items((i * 3, i) for i in range(n))
+    rng = random.Random(0)
+    key_list = [rng.randrange(6 * n) for _ in range(batch)]  # about a third hit
+    # Without NumPy the *_many methods take their per-key path
+    keys = np.array(key_list) if np is not None else key_list
+    print(f"{batch} int keys against {n} entries")
+    for label, run in (
+        ("d.get loop", lambda: [d.get(k) for k in key_list]),
+        ("get_many", lambda: d.get_many(keys)),
+        ("in loop", lambda: [k in d for k in key_list]),
+        ("contains_many", lambda: d.contains_many(keys)),
+        ("d[k] = v loop", lambda: [d.__setitem__(k, 0) for k in key_list]),
+        ("set_many", lambda: d.set_many(keys, [0] * batch)),
+    ):
+        print(f"{label:>14} | {timeit(run, number=3) / 3 * 1000:8.1f} ms")
+
+
+def analyse_swiss(n=114000, number=5):
+    # n keys sit just under 7/8 load of a 131072 slot table, SwissTable's limit
+    keys = [f"key{i}" for i in range(n)]
+    misses = [f"miss{i}" for i in range(n)]
+    for label, d in (("Dict", HighLoadDict(max_load=7 / 8)), ("swiss", Dict(backend="swiss", max_load=7 / 8))):
+        for i, k in enumerate(keys):
+            d[k] = i
+        print(f"{label:>8} | load {len(d) / d.max_len:.2f}")
+        for name, probe in (("hits", keys), ("misses", misses)):
+            seconds = timeit(lambda: [d.get(k) for k in probe], number=number)
+            print(f"{'':>8} | {name:>6} {n * number / seconds / 1e6:6.2f} M lookups/s")
+
+
+def analyse_stats(n=100000):
+    def run():
+        d = Dict()
+        for i in range(n):
+            d[i] = i
+        for i in range(0, 2 * n, 2):
+            d.get(i)
+        return d
+
+    off = timeit(run, number=3) / 3
+    dict_stats.enable()
+    try:
+        on = timeit(run, number=3) / 3
+        stats = run().stats()
+    finally:
+        dict_stats.disable()
+    print(f"{n} sets + {n} gets | stats off {off * 1000:.1f} ms | on {on * 1000:.1f} ms")
+    print(json.dumps(stats, indent=2))
+
+
+def analyse_serialization(n=1000000):
+    d = Dict.from_items((f"key{i}", i) for i in range(n))
+    pickled = pickle.dumps(d, pickle.HIGHEST_PROTOCOL)
+    dumped = d.to_bytes()
+    items = pickle.dumps(list(d.items()), pickle.HIGHEST_PROTOCOL)
+    print(f"Loading a {n} entry Dict")
+    for label, load, size in (
+        ("pickle", lambda: pickle.loads(pickled), len(pickled)),
+        ("from_bytes", lambda: Dict.from_bytes(dumped), len(dumped)),
+        # what loading costs when the table is rebuilt from its items
+        ("items + from_items", lambda: Dict.from_items(pickle.loads(items)), len(items)),
+    ):
+        seconds = timeit(load, number=3) / 3
+        print(f"{label:>18} | {seconds * 1000:8.1f} ms | {size / 2 ** 20:6.1f} MiB")
+
+
+def analyse_mmap(n=200000, lookups=100000):
+    items = [(f"key{i}", f"value{i}") for i in range(n)]
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        t1 = perf_counter_ns()
+        mmap_dict.write(path, items)
+        t2 = perf_counter_ns()
+        with mmap_dict.MmapDict(path) as d:
+            t3 = perf_counter_ns()
+            keys = [items[i * 7 % n][0] for i in range(lookups)]
+            seconds = timeit(lambda: [d[k] for k in keys], number=1)
+        pickled = pickle.dumps(Dict.from_items(items), pickle.HIGHEST_PROTOCOL)
+        load = timeit(lambda: pickle.loads(pickled), number=1)
+        print(f"{n} entries, {os.path.getsize(path) / 2 ** 20:.1f} MiB file | write {(t2 - t1) / 1e6:.0f} ms"
+              f" | open {(t3 - t2) / 1e3:.0f} us | {lookups / seconds / 1e6:.2f} M lookups/s")
+        print(f"Unpickling the same Dict in each process instead: {load * 1000:.0f} ms")
+    finally:
+        os.remove(path)
+
+
+class _LockedDict:
+    # One lock around a whole Dict, the simplest thread-safe baseline
+    def __init__(self):
+        self.table = Dict()
+        self.lock = threading.Lock()
+
+    def __setitem__(self, k, v):
+        with self.lock:
+            self.table[k] = v
+
+    def get(self, k, optional=None):
+        with self.lock:
+            return self.table.get(k, optional)
+
+
+def analyse_concurrent(ops=200000, keys=100000):
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL {'enabled' if gil else 'disabled'}")
+    for make in (_LockedDict, ConcurrentDict):
+        for threads in (1, 2, 4, 8):
+            d = make()
+            for k in range(keys):
+                d[k] = k
+            per_thread = ops // threads
+
+            def work(t):
+                # 1 write in 10, on keys of its own so writers don't collide
+                get = d.get
+                for i in range(per_thread):
+                    k = (i * 7919 + t) % keys
+                    if i % 10 == 0:
+                        d[k + keys * (t + 1)] = i
+                    else:
+                        get(k)
+
+            workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+            t1 = perf_counter_ns()
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            seconds = (perf_counter_ns() - t1) / 1e9
+            print(f"{make.__name__:>14} | {threads} threads | {per_thread * threads / seconds / 1e6:.2f} M ops/s")
+
+
+_worker_table = None
+
+
+def _load_table(table, pickled):
+    # Pool initializer: the SharedDict itself, or a pickled Dict to copy
+    global _worker_table
+    _worker_table = table if pickled is None else pickle.loads(pickled)
+
+
+def _read_keys(keys):
+    get = _worker_table.get
+    for k in keys:
+        get(k)
+    return len(keys)
+
+
+def analyse_shared(n=100000, lookups=200000):
+    items = [(f"key{i}", i) for i in range(n)]
+    keys = [items[i * 7 % n][0] for i in range(lookups)]
+    with SharedDict(capacity=n) as shared:
+        for k, v in items:
+            shared[k] = v
+        pickled = pickle.dumps(Dict.from_items(items), pickle.HIGHEST_PROTOCOL)
+        print(f"{n} entries, {lookups} lookups split over the pool; each copy is {len(pickled) / 2 ** 20:.1f} MiB pickled")
+        for processes in (1, 2, 4):
+            chunks = [keys[i::processes] for i in range(processes)]
+            for name, initargs in (("SharedDict", (shared, None)), ("Dict copies", (None, pickled))):
+                t1 = perf_counter_ns()
+                with multiprocessing.Pool(processes, initializer=_load_table, initargs=initargs) as pool:
+                    pool.map(_read_keys, chunks)
+                seconds = (perf_counter_ns() - t1) / 1e9
+                print(f"{name:>11} | {processes} processes | {seconds * 1000:6.0f} ms including pool start")
+
+
+def analyse_cow(n=200000, writes=1000):
+    items = [(i, i) for i in range(n)]
+    d = Dict.from_items(items)
+    cow = CowDict.from_items(items)
+    rebuild = timeit(lambda: Dict.from_items(d.items()), number=1)
+    snapshot = timeit(cow.snapshot, number=1000) / 1000
+    print(f"{n} entries | rebuilding a Dict copy {rebuild * 1000:.0f} ms | CowDict.snapshot() {snapshot * 1e6:.1f} us")
+
+    def write():
+        for i in range(writes):
+            cow[i * 7919 % n] = i
+    snapshots = []
+
+    def write_after_snapshots():
+        # A snapshot before every write, so each write copies its chunks
+        for i in range(writes):
+            snapshots.append(cow.snapshot())
+            cow[i * 7919 % n] = i
+    plain = timeit(write, number=1) / writes
+    shared = timeit(write_after_snapshots, number=1) / writes
+    print(f"Write {plain * 1e6:.1f} us, {shared * 1e6:.1f} us right after a snapshot")
+    keys = list(range(0, n, 7))
+    print(f"Lookups: Dict {timeit(lambda: [d[k] for k in keys], number=1) * 1000:.0f} ms,"
+          f" CowDict {timeit(lambda: [cow[k] for k in keys], number=1) * 1000:.0f} ms")
+
+
+def analyse_bloom(n=100000, lookups=200000, hit_ratio=0.1):
+    # Mostly misses: string keys on a table churn has left with tombstones,
+    # and int keys that differ only above bit 32, so they share long probe chains
+    rng = random.Random(0)
+    workloads = {
+        "strings": ([f"key{i}" for i in range(2 * n)], lambda i: f"miss{i}"),
+        "collisions": ([i << 32 for i in range(2 * n)], lambda i: (2 * n + i) << 32),
+    }
+    for name, (keys, missing) in workloads.items():
+        queries = [keys[rng.randrange(n)] if rng.random() < hit_ratio else missing(i) for i in range(lookups)]
+        for cls in (Dict, BloomDict):
+            d = cls.from_items((k, i) for i, k in enumerate(keys))
+            for k in keys[n:]:
+                del d[k]
+            get = d.get
+            seconds = timeit(lambda: [get(k) for k in queries], number=1)
+            contains = timeit(lambda: [k in d for k in queries], number=1)
+            print(f"{name:>10} | {cls.__name__:>9} | get {seconds * 1000:4.0f} ms | in {contains * 1000:4.0f} ms")
+        stats = d.filter_stats()
+        print(f"Filter: {stats['filter_bytes'] / 2 ** 20:.2f} MiB next to a {stats['index_bytes'] / 2 ** 20:.2f} MiB"
+              f" index | FP rate {stats['observed_fp_rate']:.2%} (expected {stats['expected_fp_rate']:.2%})")
+
+
+class _WeakHash:
+    # Orderable keys that all hash alike
+    def __init__(self, n):
+        self.n = n
+
+    def __hash__(self):
+        return 0
+
+    def __eq__(self, other):
+        return self.n == other.n
+
+    def __lt__(self, other):
+        return self.n < other.n
+
+
+def analyse_hardened(n=4000):
+    modulus = (1 << 61) - 1
+    key_sets = {
+        "random strings": [str(random.random()) for _ in range(n)],
+        "low bits shared": [i << 32 for i in range(n)],
+        "hash modulus": [i * modulus for i in range(n)],
+        "weak __hash__": [_WeakHash(i) for i in range(n)],
+    }
+    for name, keys in key_sets.items():
+        for cls in (Dict, HardenedDict):
+            t1 = perf_counter_ns()
+            d = cls()
+            for k in keys:
+                d[k] = k
+            t2 = perf_counter_ns()
+            for k in keys:
+                d[k]
+            t3 = perf_counter_ns()
+            mode = ""
+            if cls is HardenedDict:
+                mode = f" | keyed {d.seed is not None}, {len(d.buckets)} buckets"
+            print(f"{name:>15} | {cls.__name__:>12} | build {(t2 - t1) / 1e6:7.1f} ms"
+                  f" | lookups {(t3 - t2) / 1e6:7.1f} ms{mode}")
+
+
+def analyse_lru(requests=200000, keys=20000, maxsize=1000, s=1.1):
+    # Zipf-distributed trace: key i is requested with weight 1 / (i + 1) ** s
+    rng = random.Random(0)
+    trace = rng.choices(range(keys), weights=[1 / (i + 1) ** s for i in range(keys)], k=requests)
+
+    def run_lru_dict():
+        cache = LRUDict(maxsize)
+        get = cache.get
+        for k in trace:
+            if get(k) is None:
+                cache[k] = k
+        return cache.hits
+
+    def run_ordered_dict():
+        cache = OrderedDict()
+        hits = 0
+        for k in trace:
+            if k in cache:
+                cache.move_to_end(k)
+                hits += 1
+            else:
+                cache[k] = k
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+        return hits
+
+    def run_lru_cache():
+        cached = lru_cache(maxsize)(lambda k: k)
+        for k in trace:
+            cached(k)
+        return cached.cache_info().hits
 
-    print("Dict: ", ad, "dict: ", pd, "seconds")
+    for name, run in (("LRUDict", run_lru_dict), ("OrderedDict", run_ordered_dict), ("lru_cache", run_lru_cache)):
+        t1 = perf_counter_ns()
+        hits = run()
+        seconds = (perf_counter_ns() - t1) / 1e9
+        print(f"{name:>11} | {requests / seconds / 1e6:.2f} M requests/s | hit rate {hits / requests:.1%}")
 
 
-analyse_timing()
\ No newline at end of file
+if __name__ == "__main__":
+    analyse_timing()
+    memory_report()
+    analyse_probing()
+    analyse_bulk_load()
+    analyse_latency()
+    analyse_churn()
+    analyse_robin_hood()
+    analyse_split_tables()
+    analyse_frozen_lookups()
+    analyse_batch()
+    analyse_swiss()
+    analyse_stats()
+    analyse_serialization()
+    analyse_mmap()
+    analyse_concurrent()
+    analyse_shared()
+    analyse_cow()
+    analyse_bloom()
+    analyse_hardened()
+    analyse_lru()
@@ -0,0 +1,189 @@
+"""
+Read-only Dict stored in a file and read through mmap
+
+The file follows Dict's layout, with offsets in place of objects:
+
+    header   magic, index typecode, max_len, entry count and region offsets
+    index    max_len slots (EMPTY or an entry number), typed like Dict's
+    entries  one ENTRY record per key: hash, key and value offsets/lengths
+    blobs    the key and value bytes
+
+Opening a file only reads the header. Lookups probe the mapped index and
+entries directly, and values come back as memoryview slices of the mapping,
+so nothing is loaded or copied and every process opening the file shares
+the same pages.
+
+Keys may be bytes, str or int. Their hash is a blake2b digest of the
+encoded key rather than hash(), which changes with each process's seed.
+"""
+import mmap
+import struct
+from hashlib import blake2b
+
+from dictionary import EMPTY, PERTURB_SHIFT, _index_typecode, _length_for
+
+MAGIC = b"PYMMDICT"
+HEADER = struct.Struct("<8sc7xqqqqq")  # magic, typecode, max_len, entries, index/entries/blobs offsets
+ENTRY = struct.Struct("<QqQqQ")  # hash, key offset, key length, value offset, value length
+
+
+def _encode_key(k):
+    # Type tag + bytes, so b"1", "1" and 1 are different keys
+    if isinstance(k, (bytes, bytearray, memoryview)):
+        return b"b" + bytes(k)
+    if isinstance(k, str):
+        return b"s" + k.encode()
+    if isinstance(k, int) and not isinstance(k, bool):
+        return b"i" + k.to_bytes((k.bit_length() + 8) // 8, "little", signed=True)
+    raise TypeError(f"MmapDict keys must be bytes, str or int, not {type(k).__name__}")
+
+
+def _decode_key(data):
+    tag, body = data[:1], data[1:]
+    if tag == b"s":
+        return str(body, "utf-8")
+    if tag == b"i":
+        return int.from_bytes(body, "little", signed=True)
+    return bytes(body)
+
+
+def stable_hash(encoded):
+    """Hash of an encoded key, the same in every process"""
+    return int.from_bytes(blake2b(encoded, digest_size=8).digest(), "little")
+
+
+def _encode_value(v):
+    if isinstance(v, str):
+        return v.encode()
+    return bytes(v)
+
+
+def write(path, items):
+    """
+    Bulk writer: lays out a file for items (pairs or a mapping). Later pairs
+    win for repeated keys; values must be bytes-like or str.
+    """
+    if hasattr(items, "items"):
+        items = items.items()
+    encoded = {}
+    for k, v in items:
+        encoded[_encode_key(k)] = _encode_value(v)
+
+    n = len(encoded)
+    max_len = _length_for(n)
+    typecode = _index_typecode(max_len)
+    index = [EMPTY] * max_len
+    mask = max_len - 1
+    entries = []
+    blobs = []
+    blob_pos = 0
+    for ix, (key, value) in enumerate(encoded.items()):
+        key_hash = stable_hash(key)
+        # Dict's probe sequence; keys are distinct, so the first free slot
+        perturb = key_hash
+        i = perturb & mask
+        while index[i] != EMPTY:
+            perturb >>= PERTURB_SHIFT
+            i = (5 * i + perturb + 1) & mask
+        index[i] = ix
+        entries.append(ENTRY.pack(key_hash, blob_pos, len(key), blob_pos + len(key), len(value)))
+        blobs.append(key)
+        blobs.append(value)
+        blob_pos += len(key) + len(value)
+
+    index_bytes = memoryview(struct.pack(f"<{max_len}{typecode}", *index))
+    index_offset = HEADER.size
+    entries_offset = index_offset + len(index_bytes)
+    # 8-byte align the entry table
+    entries_offset += -entries_offset % 8
+    blobs_offset = entries_offset + n * ENTRY.size
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, typecode.encode(), max_len, n, index_offset, entries_offset, blobs_offset))
+        f.write(index_bytes)
+        f.write(b"\0" * (entries_offset - index_offset - len(index_bytes)))
+        f.write(b"".join(entries))
+        f.write(b"".join(blobs))
+
+
+class MmapDict:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, typecode, max_len, n, index_offset, entries_offset, blobs_offset = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not an MmapDict file")
+        self._view = memoryview(self._mmap)
+        size = struct.calcsize(typecode.decode())
+        self.index_list = self._view[index_offset:index_offset + max_len * size].cast(typecode.decode())
+        self.max_len = max_len
+        self.size = n
+        self._entries = entries_offset
+        self._blobs = blobs_offset
+
+    def close(self):
+        self.index_list.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _lookup(self, k):
+        # Entry record of k as (key offset, key length, value offset, value length), or None
+        key = _encode_key(k)
+        key_hash = stable_hash(key)
+        view = self._view
+        index_list = self.index_list
+        mask = self.max_len - 1
+        perturb = key_hash
+        i = perturb & mask
+        while True:
+            ix = index_list[i]
+            if ix == EMPTY:
+                return None
+            stored_hash, key_offset, key_len, value_offset, value_len = ENTRY.unpack_from(
+                view, self._entries + ix * ENTRY.size)
+            if stored_hash == key_hash and key_len == len(key):
+                start = self._blobs + key_offset
+                if view[start:start + key_len] == key:
+                    return value_offset, value_len
+            perturb >>= PERTURB_SHIFT
+            i = (5 * i + perturb + 1) & mask
+
+    def __getitem__(self, k):
+        found = self._lookup(k)
+        if found is None:
+            raise KeyError(k)
+        start = self._blobs + found[0]
+        return self._view[start:start + found[1]]
+
+    def get(self, k, optional=None):
+        try:
+            return self.__getitem__(k)
+        except KeyError:
+            return optional
+
+    def __contains__(self, k):
+        return self._lookup(k) is not None
+
+    def __len__(self):
+        return self.size
+
+    def items(self):
+        # Entry order is the writer's insertion order
+        view = self._view
+        for ix in range(self.size):
+            _, key_offset, key_len, value_offset, value_len = ENTRY.unpack_from(view, self._entries + ix * ENTRY.size)
+            key = _decode_key(view[self._blobs + key_offset:self._blobs + key_offset + key_len])
+            yield key, view[self._blobs + value_offset:self._blobs + value_offset + value_len]
+
+    def keys(self):
+        for k, _ in self.items():
+            yield k
+
+    def __iter__(self):
+        return self.keys()
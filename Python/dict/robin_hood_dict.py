@@ -0,0 +1,170 @@
+"""
+Dict backend using Robin Hood linear probing
+
+Each index slot also records how far its entry sits from its home slot (its
+probe distance). An insert walking the chain takes the slot of any resident
+closer to home than itself ("richer") and carries that resident on, which
+keeps distances short and even. That gives lookups an early exit: once the
+distance walked exceeds the resident's, the key can't be further on.
+
+Deletes shift the following entries of the run one slot back, so the index
+never holds tombstones and chains don't degrade under churn. That keeps
+chains short even at high load, set with max_load.
+"""
+from array import array
+
+from dictionary import Dict, DELETED, EMPTY, HASH_MASK, _new_index, np
+
+
+class RobinHoodDict(Dict):
+    def __init__(self, capacity=0, max_load=2 / 3, **kwargs):
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+        self.max_load = max_load
+        super().__init__(capacity, **kwargs)
+        self.dist = array("i", [0]) * self.max_len
+        self._reserve(capacity)
+
+    def _lookup(self, key_hash, k):
+        # On a miss, returns the slot k belongs in
+        index_list = self.index_list
+        dist = self.dist
+        mask = self.max_len - 1
+        i = key_hash & HASH_MASK & mask
+        d = 0
+        while True:
+            ix = index_list[i]
+            if ix == EMPTY or dist[i] < d:
+                return i, EMPTY
+            if self.entry_hashes[ix] == key_hash:
+                key = self.entry_keys[ix]
+                if key is k or key == k:
+                    return i, ix
+            i = (i + 1) & mask
+            d += 1
+
+    def _place(self, i, ix):
+        # Put entry ix at slot i, pushing richer residents along
+        index_list = self.index_list
+        dist = self.dist
+        mask = self.max_len - 1
+        d = (i - (self.entry_hashes[ix] & HASH_MASK)) & mask
+        while True:
+            resident = index_list[i]
+            if resident == EMPTY:
+                index_list[i] = ix
+                dist[i] = d
+                return
+            if dist[i] < d:
+                index_list[i], ix = ix, resident
+                dist[i], d = d, dist[i]
+            i = (i + 1) & mask
+            d += 1
+
+    def _resize(self, length):
+        old_hashes = self.entry_hashes
+        old_keys = self.entry_keys
+        old_values = self.entry_values
+        self.version += 1
+        self.index_list = _new_index(length)
+        self.dist = array("i", [0]) * length
+        self.max_len = length
+        self.entry_hashes = array("q")
+        self.entry_keys = []
+        self.entry_values = []
+        for i, k in enumerate(old_keys):
+            if k is DELETED:
+                continue
+            key_hash = old_hashes[i]
+            self.entry_hashes.append(key_hash)
+            self.entry_keys.append(k)
+            self.entry_values.append(old_values[i])
+            self._place(key_hash & HASH_MASK & (length - 1), len(self.entry_keys) - 1)
+
+    def _grown_length(self):
+        # The index holds no tombstones, only the entry arrays do; when enough
+        # of those are dead, compacting them makes room without growing. The
+        # floor of 8 keeps small tables growing like Dict's.
+        tombstones = len(self.entry_keys) - self.size
+        if tombstones >= max(self.max_len // 16, 8):
+            return self.max_len
+        # Otherwise double, so a grown table starts at half of max_load
+        length = self.max_len * 2
+        while self.size >= length * self.max_load / 2:
+            length *= 2
+        return length
+
+    def _check_and_resize(self):
+        if len(self.entry_keys) >= int(self.max_len * self.max_load):
+            self._resize(self._grown_length())
+
+    def _reserve(self, n):
+        # Dict's version assumes its fixed 2/3 load
+        if len(self.entry_keys) + n >= int(self.max_len * self.max_load):
+            length = self.max_len
+            while self.size + n >= int(length * self.max_load):
+                length *= 2
+            self._resize(length)
+
+    def _insert_hashed(self, entries):
+        for key_hash, k, v in entries:
+            idx, ix = self._lookup(key_hash, k)
+            if ix >= 0:
+                self.entry_values[ix] = v
+                continue
+            self.entry_hashes.append(key_hash)
+            self.entry_keys.append(k)
+            self.entry_values.append(v)
+            self._place(idx, len(self.entry_keys) - 1)
+            self.size += 1
+            self.version += 1
+
+    def _lookup_many(self, keys, hashes):
+        # The vectorized probe follows Dict's probe sequence, so go key by key
+        return np.fromiter(
+            (self._lookup(key_hash, k)[1] for key_hash, k in zip(hashes.tolist(), keys.tolist())),
+            dtype=np.int64, count=len(keys))
+
+    def probe_lengths(self):
+        """Mean and worst slots visited to find a live key"""
+        used = [d for d, ix in zip(self.dist, self.index_list) if ix != EMPTY]
+        if not used:
+            return 0.0, 0
+        return sum(used) / len(used) + 1, max(used) + 1
+
+    def __setitem__(self, k, v):
+        key_hash = hash(k)
+        idx, ix = self._lookup(key_hash, k)
+        if ix >= 0:
+            self.entry_values[ix] = v
+            return
+
+        self.entry_hashes.append(key_hash)
+        self.entry_keys.append(k)
+        self.entry_values.append(v)
+        self._place(idx, len(self.entry_keys) - 1)
+        self.size += 1
+        self.version += 1
+        self._check_and_resize()
+
+    def __delitem__(self, k):
+        idx, ix = self._lookup(hash(k), k)
+        if ix < 0:
+            raise KeyError(k)
+        # Backward shift: pull the rest of the run one slot closer to home
+        index_list = self.index_list
+        dist = self.dist
+        mask = self.max_len - 1
+        nxt = (idx + 1) & mask
+        while index_list[nxt] != EMPTY and dist[nxt] > 0:
+            index_list[idx] = index_list[nxt]
+            dist[idx] = dist[nxt] - 1
+            idx = nxt
+            nxt = (nxt + 1) & mask
+        index_list[idx] = EMPTY
+        dist[idx] = 0
+        self.entry_keys[ix] = DELETED
+        self.entry_values[ix] = None
+        self.size -= 1
+        self.version += 1
+        self._check_and_compact()
@@ -0,0 +1,331 @@
+"""
+Dict whose index and entries live in multiprocessing.shared_memory
+
+Every process attached to a SharedDict reads the same pages, so a pool of
+workers shares one copy of a lookup table instead of unpickling its own.
+
+Two kinds of segment:
+
+    control          generation and seq numbers
+    <name>_<gen>     one generation of the table: header, index, entries, blobs
+
+The table has Dict's layout, with offsets in place of objects: an int64
+index probed like Dict's, ENTRY records in insertion order, and the key and
+value bytes. Keys are encoded and hashed as in mmap_dict (bytes, str or
+int, with a hash that is the same in every process); values are pickled.
+
+Any process holding the lock may write. A write makes seq odd while it
+changes the table and even again after (a seqlock, as in concurrent_dict),
+and readers, which never lock, retry when seq moved under them. A resize
+writes a whole new generation and publishes it by bumping the generation
+number; readers notice on their next lookup and attach to it. The old
+segment is unlinked at once, processes still reading it keep their mapping
+until they move on.
+
+Meant for processes started from the creator through multiprocessing: they
+share its resource tracker, which unlinks whatever is left at exit.
+"""
+import multiprocessing
+import pickle
+import struct
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+
+from dictionary import DUMMY, EMPTY, PERTURB_SHIFT, _growth_length
+from mmap_dict import _decode_key, _encode_key, stable_hash
+
+CONTROL = struct.Struct("<qq")  # generation, seq
+HEADER = struct.Struct("<qqqqq")  # max_len, entry capacity, entries used, live size, blob bytes used
+ENTRY = struct.Struct("<Qqqqq")  # hash, key offset, key length, value offset, value length
+DELETED = -1  # key offset of a deleted entry
+
+
+def _unlink(name):
+    shm = SharedMemory(name)
+    shm.close()
+    shm.unlink()
+
+
+class _Table:
+    """One generation, mapped into this process"""
+
+    def __init__(self, shm):
+        self.shm = shm
+        self.buf = shm.buf
+        self.max_len, self.capacity = HEADER.unpack_from(self.buf)[:2]
+        self.index_list = self.buf[HEADER.size:HEADER.size + 8 * self.max_len].cast("q")
+        self.entries = HEADER.size + 8 * self.max_len
+        self.blobs = self.entries + ENTRY.size * self.capacity
+        self.blob_capacity = shm.size - self.blobs
+
+    @classmethod
+    def create(cls, name, max_len, capacity, blob_capacity):
+        size = HEADER.size + 8 * max_len + ENTRY.size * capacity + blob_capacity
+        shm = SharedMemory(name, create=True, size=size)
+        HEADER.pack_into(shm.buf, 0, max_len, capacity, 0, 0, 0)
+        shm.buf[HEADER.size:HEADER.size + 8 * max_len] = memoryview(array("q", [EMPTY]) * max_len).cast("B")
+        return cls(shm)
+
+    def close(self):
+        self.index_list.release()
+        self.buf = None
+        self.shm.close()
+
+    def header(self):
+        return HEADER.unpack_from(self.buf)
+
+    def entry(self, ix):
+        return ENTRY.unpack_from(self.buf, self.entries + ix * ENTRY.size)
+
+    def blob(self, offset, length):
+        start = self.blobs + offset
+        return self.buf[start:start + length]
+
+    def lookup(self, key_hash, key):
+        # (slot, entry index) as in Dict._lookup: the entry index is EMPTY if
+        # key is missing, and slot is then where it would go
+        index_list = self.index_list
+        mask = self.max_len - 1
+        perturb = key_hash
+        i = perturb & mask
+        free = None
+        while True:
+            ix = index_list[i]
+            if ix == EMPTY:
+                return (i if free is None else free), EMPTY
+            if ix == DUMMY:
+                if free is None:
+                    free = i
+            else:
+                stored_hash, key_offset, key_len, _, _ = self.entry(ix)
+                if stored_hash == key_hash and key_len == len(key) and self.blob(key_offset, key_len) == key:
+                    return i, ix
+            perturb >>= PERTURB_SHIFT
+            i = (5 * i + perturb + 1) & mask
+
+
+class SharedDict:
+    def __init__(self, name=None, lock=None, capacity=0):
+        """
+        SharedDict() creates a new table, which the creating process should
+        unlink() when done. SharedDict(name, lock) attaches to an existing
+        one; without the lock it is read-only.
+        """
+        if name is None:
+            self.lock = lock or multiprocessing.Lock()
+            self._control = SharedMemory(create=True, size=CONTROL.size)
+            self.name = self._control.name
+            CONTROL.pack_into(self._control.buf, 0, 0, 0)
+            self._owner = True
+            max_len = _growth_length(capacity)
+            self._table = _Table.create(f"{self.name}_0", max_len, (max_len * 2) // 3, 4096)
+        else:
+            self.lock = lock
+            self._control = SharedMemory(name)
+            self.name = name
+            self._owner = False
+            self._table = None
+        self._generation = -1 if self._table is None else 0
+
+    def __reduce__(self):
+        # The lock only pickles while starting a process, e.g. as Pool initargs
+        return SharedDict, (self.name, self.lock)
+
+    def _seq(self):
+        return CONTROL.unpack_from(self._control.buf)[1]
+
+    def _set_control(self, generation, seq):
+        CONTROL.pack_into(self._control.buf, 0, generation, seq)
+
+    def _current(self):
+        # The table of the latest generation, attaching to it if it changed
+        generation = CONTROL.unpack_from(self._control.buf)[0]
+        if generation != self._generation:
+            table = _Table(SharedMemory(f"{self.name}_{generation}"))
+            if self._table is not None:
+                self._table.close()
+            self._table, self._generation = table, generation
+        return self._table
+
+    def _read(self, read, *args):
+        while True:
+            seq = self._seq()
+            if seq & 1:
+                continue
+            try:
+                result = read(self._current(), *args)
+            except FileNotFoundError:
+                continue  # that generation was replaced before we got to it
+            except Exception:
+                if self._seq() == seq:
+                    raise
+                continue
+            if self._seq() == seq:
+                return result
+
+    def _write(self, write, *args):
+        if self.lock is None:
+            raise TypeError("SharedDict attached without its lock is read-only")
+        with self.lock:
+            generation, seq = CONTROL.unpack_from(self._control.buf)
+            self._set_control(generation, seq + 1)
+            try:
+                return write(self._current(), *args)
+            finally:
+                generation = CONTROL.unpack_from(self._control.buf)[0]
+                self._set_control(generation, seq + 2)
+
+    @staticmethod
+    def _get(table, key_hash, key):
+        _, ix = table.lookup(key_hash, key)
+        if ix == EMPTY:
+            return None
+        _, _, _, value_offset, value_len = table.entry(ix)
+        return (pickle.loads(table.blob(value_offset, value_len)),)
+
+    def __getitem__(self, k):
+        key = _encode_key(k)
+        found = self._read(self._get, stable_hash(key), key)
+        if found is None:
+            raise KeyError(k)
+        return found[0]
+
+    def get(self, k, optional=None):
+        key = _encode_key(k)
+        found = self._read(self._get, stable_hash(key), key)
+        return optional if found is None else found[0]
+
+    def __contains__(self, k):
+        key = _encode_key(k)
+        return self._read(lambda table: table.lookup(stable_hash(key), key)[1] != EMPTY)
+
+    def __len__(self):
+        return self._read(lambda table: table.header()[3])
+
+    def _resize(self, table, extra_blob):
+        # Copy the live entries into a new generation and publish it
+        max_len, capacity, used, size, blob_used = table.header()
+        live = [table.entry(ix) for ix in range(used) if table.entry(ix)[1] != DELETED]
+        live_bytes = sum(key_len + value_len for _, _, key_len, _, value_len in live)
+        new_len = _growth_length(size + 1)
+        generation = self._generation + 1
+        new = _Table.create(f"{self.name}_{generation}", new_len, (new_len * 2) // 3,
+                            max(4096, 2 * (live_bytes + extra_blob)))
+        for key_hash, key_offset, key_len, value_offset, value_len in live:
+            key = bytes(table.blob(key_offset, key_len))
+            self._append(new, new.lookup(key_hash, key)[0], key_hash, key, table.blob(value_offset, value_len))
+        old_generation = self._generation
+        self._set_control(generation, self._seq())
+        self._table, self._generation = new, generation
+        table.close()
+        _unlink(f"{self.name}_{old_generation}")
+        return new
+
+    @staticmethod
+    def _append(table, slot, key_hash, key, value):
+        # Blobs and entry first, then the index slot that points at them
+        max_len, capacity, used, size, blob_used = table.header()
+        table.buf[table.blobs + blob_used:table.blobs + blob_used + len(key)] = key
+        value_offset = blob_used + len(key)
+        table.buf[table.blobs + value_offset:table.blobs + value_offset + len(value)] = value
+        ENTRY.pack_into(table.buf, table.entries + used * ENTRY.size,
+                        key_hash, blob_used, len(key), value_offset, len(value))
+        table.index_list[slot] = used
+        HEADER.pack_into(table.buf, 0, max_len, capacity, used + 1, size + 1,
+                         value_offset + len(value))
+
+    def _set(self, table, k, v):
+        key = _encode_key(k)
+        key_hash = stable_hash(key)
+        value = pickle.dumps(v, pickle.HIGHEST_PROTOCOL)
+        slot, ix = table.lookup(key_hash, key)
+        max_len, capacity, used, size, blob_used = table.header()
+        needed = len(value) if ix >= 0 else len(key) + len(value)
+        if blob_used + needed > table.blob_capacity or (ix == EMPTY and used == capacity):
+            table = self._resize(table, needed)
+            slot, ix = table.lookup(key_hash, key)
+        if ix == EMPTY:
+            self._append(table, slot, key_hash, key, value)
+            return
+        # The entry now points at a new copy of the value
+        max_len, capacity, used, size, blob_used = table.header()
+        table.buf[table.blobs + blob_used:table.blobs + blob_used + len(value)] = value
+        stored_hash, key_offset, key_len, _, _ = table.entry(ix)
+        ENTRY.pack_into(table.buf, table.entries + ix * ENTRY.size,
+                        stored_hash, key_offset, key_len, blob_used, len(value))
+        HEADER.pack_into(table.buf, 0, max_len, capacity, used, size, blob_used + len(value))
+
+    def __setitem__(self, k, v):
+        self._write(self._set, k, v)
+
+    @staticmethod
+    def _delete_entry(table, slot, ix):
+        max_len, capacity, used, size, blob_used = table.header()
+        table.index_list[slot] = DUMMY
+        stored_hash, _, key_len, value_offset, value_len = table.entry(ix)
+        ENTRY.pack_into(table.buf, table.entries + ix * ENTRY.size, stored_hash, DELETED, key_len, value_offset,
+                        value_len)
+        HEADER.pack_into(table.buf, 0, max_len, capacity, used, size - 1, blob_used)
+
+    def _delete(self, table, k):
+        key = _encode_key(k)
+        slot, ix = table.lookup(stable_hash(key), key)
+        if ix == EMPTY:
+            raise KeyError(k)
+        self._delete_entry(table, slot, ix)
+
+    def __delitem__(self, k):
+        self._write(self._delete, k)
+
+    @staticmethod
+    def _items(table):
+        used = table.header()[2]
+        items = []
+        for ix in range(used):
+            _, key_offset, key_len, value_offset, value_len = table.entry(ix)
+            if key_offset != DELETED:
+                items.append((_decode_key(table.blob(key_offset, key_len)),
+                              pickle.loads(table.blob(value_offset, value_len))))
+        return items
+
+    def items(self):
+        """Snapshot of the items, in insertion order"""
+        return self._read(self._items)
+
+    def keys(self):
+        return [k for k, _ in self.items()]
+
+    def values(self):
+        return [v for _, v in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __repr__(self):
+        return "".join([f"{k} - {v}\n" for k, v in self.items()])
+
+    def __str__(self):
+        return self.__repr__()
+
+    def close(self):
+        """Detach this process; the table stays for the others"""
+        if self._table is not None:
+            self._table.close()
+            self._table = None
+        self._control.close()
+
+    def unlink(self):
+        """Remove the table for good; called once, by the creator"""
+        generation = CONTROL.unpack_from(self._control.buf)[0]
+        self.close()
+        _unlink(f"{self.name}_{generation}")
+        _unlink(self.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._owner:
+            self.unlink()
+        else:
+            self.close()
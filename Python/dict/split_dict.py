@@ -0,0 +1,179 @@
+"""
+Key-sharing dictionaries, after PEP 412
+
+Many record-like dicts use the same few keys in the same order. A SharedKeys
+object holds the hashes, keys and index table once, and every SplitDict built
+on it stores nothing but a values array lined up with those keys. A SplitDict
+whose keys stop following the shared order (or that outgrows the shared
+table) switches to an ordinary combined Dict.
+"""
+from array import array
+
+from dictionary import Dict, DictItems, DictKeys, DictValues, DELETED, EMPTY, _new_index
+
+
+class SharedKeys:
+    max_keys = 30  # same cap as CPython's SHARED_KEYS_MAX_SIZE
+
+    def __init__(self):
+        self.max_len = 8
+        self.index_list = _new_index(8)
+        self.entry_hashes = array("q")
+        self.entry_keys = []
+
+    # Only keys are stored, so Dict's probing works as is
+    _lookup = Dict._lookup
+    _find_empty_slot = Dict._find_empty_slot
+
+    def __len__(self):
+        return len(self.entry_keys)
+
+    def add(self, key_hash, k, idx):
+        """Append k at the free slot idx; returns its position, or EMPTY when full"""
+        if len(self.entry_keys) >= self.max_keys:
+            return EMPTY
+        ix = len(self.entry_keys)
+        self.index_list[idx] = ix
+        self.entry_hashes.append(key_hash)
+        self.entry_keys.append(k)
+        if len(self.entry_keys) >= (self.max_len * 2) // 3:
+            # Keys are never removed, so positions survive rebuilding the index
+            self.max_len *= 2
+            self.index_list = _new_index(self.max_len)
+            for i, key_hash in enumerate(self.entry_hashes):
+                self.index_list[self._find_empty_slot(key_hash)] = i
+        return ix
+
+
+class SplitDict:
+    __slots__ = ("shared", "value_list", "size", "version", "combined")
+
+    def __init__(self, shared):
+        self.shared = shared
+        # value_list[i] belongs to shared.entry_keys[i]; DELETED marks keys this
+        # instance doesn't have. Its last item is always a live value.
+        self.value_list = []
+        self.size = 0
+        self.version = 0
+        self.combined = None
+
+    @property
+    def is_split(self):
+        return self.combined is None
+
+    def _combine(self):
+        combined = Dict(capacity=self.size + 1)
+        combined._insert_many(self._iter_items())
+        self.combined = combined
+        self.shared = None
+        self.value_list = None
+        self.version += 1
+
+    def __setitem__(self, k, v):
+        if self.combined is not None:
+            self.combined[k] = v
+            return
+        key_hash = hash(k)
+        idx, ix = self.shared._lookup(key_hash, k)
+        values = self.value_list
+        if 0 <= ix < len(values):
+            if values[ix] is not DELETED:
+                values[ix] = v
+                return
+            # Re-adding a key in front of live ones would change the order
+            self._combine()
+            self.combined[k] = v
+            return
+        if ix == EMPTY:
+            if len(values) < len(self.shared):
+                # Another instance added keys this one skipped
+                self._combine()
+                self.combined[k] = v
+                return
+            ix = self.shared.add(key_hash, k, idx)
+            if ix == EMPTY:
+                self._combine()
+                self.combined[k] = v
+                return
+        values.extend([DELETED] * (ix - len(values)))
+        values.append(v)
+        self.size += 1
+        self.version += 1
+
+    def __getitem__(self, k):
+        if self.combined is not None:
+            return self.combined[k]
+        ix = self.shared._lookup(hash(k), k)[1]
+        if 0 <= ix < len(self.value_list):
+            v = self.value_list[ix]
+            if v is not DELETED:
+                return v
+        raise KeyError(k)
+
+    def __delitem__(self, k):
+        if self.combined is not None:
+            del self.combined[k]
+            return
+        ix = self.shared._lookup(hash(k), k)[1]
+        values = self.value_list
+        if not 0 <= ix < len(values) or values[ix] is DELETED:
+            raise KeyError(k)
+        values[ix] = DELETED
+        while values and values[-1] is DELETED:
+            values.pop()
+        self.size -= 1
+        self.version += 1
+
+    def __len__(self):
+        if self.combined is not None:
+            return len(self.combined)
+        return self.size
+
+    def __repr__(self):
+        return "".join([f"{k} - {v}\n" for k, v in self.items()])
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __contains__(self, k):
+        if self.combined is not None:
+            return k in self.combined
+        ix = self.shared._lookup(hash(k), k)[1]
+        return 0 <= ix < len(self.value_list) and self.value_list[ix] is not DELETED
+
+    def _iter_items(self):
+        if self.combined is not None:
+            yield from self.combined._iter_items()
+            return
+        version = self.version
+        for k, v in zip(self.shared.entry_keys, self.value_list):
+            if v is not DELETED:
+                yield k, v
+                if self.version != version:
+                    raise RuntimeError("Dict changed during iteration")
+
+    def _iter_keys(self):
+        for k, _ in self._iter_items():
+            yield k
+
+    def _iter_values(self):
+        for _, v in self._iter_items():
+            yield v
+
+    def __iter__(self):
+        return self._iter_keys()
+
+    def get(self, k, optional=None):
+        try:
+            return self.__getitem__(k)
+        except KeyError:
+            return optional
+
+    def keys(self):
+        return DictKeys(self)
+
+    def values(self):
+        return DictValues(self)
+
+    def items(self):
+        return DictItems(self)
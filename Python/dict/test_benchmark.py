@@ -0,0 +1,34 @@
+import io
+import unittest
+import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_run_suite(self):
+        out = io.StringIO()
+        report = benchmark.run_suite([50], list(benchmark.IMPLEMENTATIONS), list(benchmark.WORKLOADS),
+                                     repeat=3, out=out)
+        cases = {(c["implementation"], c["workload"]) for c in report["results"]}
+        # dictionary_without_delete.Dict can't delete, so it sits out churn
+        self.assertNotIn(("without_delete", "churn"), cases)
+        self.assertEqual(len(cases), 14)
+        for case in report["results"]:
+            self.assertNotIn("error", case)
+            self.assertEqual(len(case["runs"]), 3)
+            self.assertGreaterEqual(case["iqr_s"], 0)
+            self.assertIn("peak_bytes", case)
+        self.assertEqual(len(out.getvalue().splitlines()), 14)
+
+    def test_compare_flags_regressions(self):
+        def report(*medians):
+            return {"results": [{"implementation": "Dict", "workload": w, "size": 10, "median_s": m}
+                                for w, m in zip(("misses", "churn"), medians)]}
+
+        regressions = benchmark.compare(report(1.0, 1.0), report(1.05, 1.5), threshold=0.1)
+        self.assertEqual([(c["workload"], r) for c, r in regressions], [("churn", 1.5)])
+        self.assertEqual(benchmark.compare(report(1.0, 1.0), report(0.5, 1.0)), [])
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,81 @@
+import pickle
+import unittest
+import test_dict
+from bloom_dict import BloomDict, CountingBloomFilter
+from dictionary import Dict
+
+
+# The whole test_dict.py suite, run with the filter in front
+
+class TestBloomDictBasics(test_dict.TestDict):
+    dict_class = BloomDict
+
+
+class TestBloomCompactStorage(test_dict.TestCompactStorage):
+    dict_class = BloomDict
+
+
+class TestBloomProbing(test_dict.TestProbing):
+    dict_class = BloomDict
+
+
+class TestBloomBulkConstruction(test_dict.TestBulkConstruction):
+    dict_class = BloomDict
+
+
+class TestBloomCompaction(test_dict.TestCompaction):
+    dict_class = BloomDict
+
+
+class TestBloomViews(test_dict.TestViews):
+    dict_class = BloomDict
+
+
+class TestBloomBatchOperations(test_dict.TestBatchOperations):
+    dict_class = BloomDict
+
+
+class TestBloomDict(unittest.TestCase):
+
+    def test_backend_selection(self):
+        self.assertIsInstance(Dict(backend="bloom"), BloomDict)
+
+    def test_no_false_negatives(self):
+        d = BloomDict()
+        for i in range(5000):
+            d[str(i)] = i
+        for i in range(0, 5000, 3):
+            del d[str(i)]
+        for i in range(5000):
+            self.assertEqual(str(i) in d, i % 3 != 0)
+        self.assertEqual(len(d.filter.counts), d.max_len * BloomDict.counters_per_slot)
+
+    def test_misses_are_filtered(self):
+        d = BloomDict.from_items((i, i) for i in range(1000))
+        for i in range(1000, 11000):
+            self.assertIsNone(d.get(i))
+        stats = d.filter_stats()
+        self.assertEqual(stats["rejected"] + stats["false_positives"], 10000)
+        self.assertLess(stats["observed_fp_rate"], 0.1)
+        self.assertAlmostEqual(stats["observed_fp_rate"], stats["expected_fp_rate"], delta=0.03)
+        self.assertEqual(stats["filter_bytes"], stats["counters"])
+
+    def test_filter_survives_serialization(self):
+        d = BloomDict.from_items((i, str(i)) for i in range(100))
+        for restored in (pickle.loads(pickle.dumps(d)), BloomDict.from_bytes(d.to_bytes())):
+            self.assertEqual([restored[i] for i in range(100)], [str(i) for i in range(100)])
+            self.assertNotIn(100, restored)
+
+    def test_saturated_counters_stay_set(self):
+        f = CountingBloomFilter(8, hashes=1)
+        for _ in range(300):
+            f.add(0)
+        for _ in range(300):
+            f.remove(0)
+        self.assertTrue(f.might_contain(0))
+        with self.assertRaises(ValueError):
+            CountingBloomFilter(10)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
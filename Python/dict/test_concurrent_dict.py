@@ -0,0 +1,77 @@
+import threading
+import unittest
+from concurrent_dict import ConcurrentDict
+
+
+class TestConcurrentDict(unittest.TestCase):
+
+    def setUp(self):
+        self.d = ConcurrentDict(segments=4)
+
+    def test_basic_operations(self):
+        for i in range(100):
+            self.d[i] = str(i)
+        self.assertEqual(len(self.d), 100)
+        self.assertEqual(self.d[42], '42')
+        self.assertIn(99, self.d)
+        self.assertIsNone(self.d.get(100))
+        del self.d[42]
+        self.assertNotIn(42, self.d)
+        with self.assertRaises(KeyError):
+            self.d[42]
+        with self.assertRaises(KeyError):
+            del self.d[42]
+        self.assertEqual(sorted(self.d.keys()), [i for i in range(100) if i != 42])
+        self.assertEqual(self.d.setdefault(1, 'x'), '1')
+        self.assertEqual(self.d.setdefault(42, 'x'), 'x')
+        # small ints spread over all segments
+        self.assertTrue(all(len(seg.table) for seg in self.d.segments))
+
+    def test_segments_must_be_power_of_two(self):
+        with self.assertRaises(ValueError):
+            ConcurrentDict(segments=3)
+        d = ConcurrentDict(segments=1)
+        d['a'] = 1
+        self.assertEqual(d['a'], 1)
+
+    def test_unhashable(self):
+        with self.assertRaises(TypeError):
+            self.d[[1]] = 1
+
+    def test_concurrent_writers_and_readers(self):
+        writers, per_writer = 4, 2000
+        errors = []
+        stop = threading.Event()
+
+        def write(w):
+            for i in range(per_writer):
+                k = w * per_writer + i
+                self.d[k] = k
+                if i % 3 == 0:
+                    del self.d[k]
+
+        def read():
+            # keys are only ever mapped to themselves, so any other value is a torn read
+            while not stop.is_set():
+                for k in range(0, writers * per_writer, 7):
+                    v = self.d.get(k)
+                    if v is not None and v != k:
+                        errors.append((k, v))
+
+        readers = [threading.Thread(target=read) for _ in range(2)]
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+        for t in readers + threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stop.set()
+        for t in readers:
+            t.join()
+        self.assertEqual(errors, [])
+        expected = sorted(k for k in range(writers * per_writer) if k % per_writer % 3)
+        self.assertEqual(sorted(self.d.keys()), expected)
+        self.assertEqual(len(self.d), len(expected))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
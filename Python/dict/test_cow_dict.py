@@ -0,0 +1,112 @@
+import pickle
+import unittest
+import test_dict
+from cow_dict import CowDict, CowSnapshot
+from dictionary import Dict
+
+
+# The whole test_dict.py suite, run against the copy-on-write backend
+
+class TestCowDictBasics(test_dict.TestDict):
+    dict_class = CowDict
+
+
+class TestCowCompactStorage(test_dict.TestCompactStorage):
+    dict_class = CowDict
+
+
+class TestCowProbing(test_dict.TestProbing):
+    dict_class = CowDict
+
+
+class TestCowBulkConstruction(test_dict.TestBulkConstruction):
+    dict_class = CowDict
+
+
+class TestCowCompaction(test_dict.TestCompaction):
+    dict_class = CowDict
+
+
+class TestCowViews(test_dict.TestViews):
+    dict_class = CowDict
+
+
+class TestCowBatchOperations(test_dict.TestBatchOperations):
+    dict_class = CowDict
+
+
+class TestCowSerialization(test_dict.TestSerialization):
+    dict_class = CowDict
+
+
+class TestCowDict(unittest.TestCase):
+
+    def setUp(self):
+        # 8 slots per chunk, so a few hundred keys span many chunks
+        self.d = CowDict(chunk_bits=3)
+        for i in range(300):
+            self.d[i] = str(i)
+
+    def test_backend_selection(self):
+        self.assertIsInstance(Dict(backend="cow"), CowDict)
+
+    def test_snapshot_shares_storage(self):
+        snap = self.d.snapshot()
+        self.assertIsInstance(snap, CowSnapshot)
+        self.assertIs(snap._index, self.d._index)
+        self.assertIs(snap._values, self.d._values)
+
+    def test_write_copies_one_chunk(self):
+        snap = self.d.snapshot()
+        self.d[5] = 'five'
+        changed = [a is not b for a, b in zip(self.d._values, snap._values)]
+        self.assertEqual(changed.count(True), 1)
+        self.assertTrue(all(a is b for a, b in zip(self.d._index, snap._index)))
+        self.assertEqual(snap[5], '5')
+        self.assertEqual(self.d[5], 'five')
+
+    def test_snapshot_is_a_point_in_time_view(self):
+        snap = self.d.snapshot()
+        for i in range(300, 1000):
+            self.d[i] = str(i)
+        for i in range(0, 300, 2):
+            del self.d[i]
+        self.assertEqual(len(snap), 300)
+        self.assertEqual(list(snap.keys()), list(range(300)))
+        self.assertNotIn(300, snap)
+        self.assertEqual(len(self.d), 850)
+        self.assertNotIn(0, self.d)
+
+    def test_snapshot_is_read_only(self):
+        snap = self.d.snapshot()
+        with self.assertRaises(TypeError):
+            snap[1] = 2
+        with self.assertRaises(TypeError):
+            del snap[1]
+        with self.assertRaises(TypeError):
+            snap.update({1: 2})
+        self.assertEqual(snap[1], '1')
+
+    def test_copies_are_independent(self):
+        other = self.d.copy()
+        other[1] = 'one'
+        del other[2]
+        self.d[3] = 'three'
+        self.assertEqual((self.d[1], self.d[2], self.d[3]), ('1', '2', 'three'))
+        self.assertEqual((other[1], other.get(2), other[3]), ('one', None, '3'))
+        snap = self.d.snapshot()
+        writable = snap.copy()
+        writable[1] = 'uno'
+        self.assertEqual(snap[1], '1')
+
+    def test_pickle_round_trip(self):
+        snap = self.d.snapshot()
+        self.d[0] = 'zero'
+        restored = pickle.loads(pickle.dumps(snap))
+        self.assertIsInstance(restored, CowSnapshot)
+        self.assertEqual(restored.chunk_bits, 3)
+        self.assertEqual(list(restored.items()), list(snap.items()))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
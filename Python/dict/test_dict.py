@@ -1,11 +1,15 @@
+import pickle
+import struct
+import sys
 import unittest
-from dictionary import Dict
+from dictionary import Dict, DELETED, DUMMY, EMPTY, np, _int_hashes
 
 class TestDict(unittest.TestCase):
+    dict_class = Dict
 
     def setUp(self):
         # This method runs before each test
-        self.d = Dict()
+        self.d = self.dict_class()
 
     # --- Basic Functionality Tests ---
 
@@ -313,6 +317,418 @@ class TestDict(unittest.TestCase):
         self.assertFalse('' in self.d)
         self.assertTrue(None in self.d)
 
+    # --- Ordered Operations ---
+
+    def test_popitem(self):
+        for i in range(5):
+            self.d[i] = str(i)
+        self.assertEqual(self.d.popitem(), (4, '4'))
+        self.assertEqual(self.d.popitem(last=False), (0, '0'))
+        self.assertEqual(list(self.d.keys()), [1, 2, 3])
+        self.assertEqual(self.d.peekitem(), (3, '3'))
+        self.assertEqual(self.d.peekitem(last=False), (1, '1'))
+        self.d[9] = '9'
+        self.assertEqual([self.d.popitem(last=False)[0] for _ in range(4)], [1, 2, 3, 9])
+        with self.assertRaises(KeyError):
+            self.d.popitem()
+        with self.assertRaises(KeyError):
+            self.d.peekitem()
+        self.d['a'] = 1
+        self.assertEqual(self.d.popitem(last=False), ('a', 1))
+
+    def test_popitem_recycles_entries(self):
+        for i in range(5):
+            self.d[i] = i
+        del self.d[3]
+        self.d.popitem()
+        self.d[5] = 5
+        self.assertEqual(list(self.d.items()), [(0, 0), (1, 1), (2, 2), (5, 5)])
+        self.assertEqual(len(self.d.entry_keys), 4)
+
+    def test_popitem_from_front_at_scale(self):
+        for i in range(2000):
+            self.d[i] = i
+        for i in range(1000):
+            self.assertEqual(self.d.popitem(last=False), (i, i))
+            self.d[2000 + i] = i
+        self.assertEqual(len(self.d), 2000)
+        self.assertEqual(next(iter(self.d)), 1000)
+
+    def test_move_to_end(self):
+        for k in 'abcd':
+            self.d[k] = k.upper()
+        self.d.move_to_end('b')
+        self.assertEqual(list(self.d.keys()), ['a', 'c', 'd', 'b'])
+        self.d.move_to_end('b')
+        self.assertEqual(list(self.d.keys()), ['a', 'c', 'd', 'b'])
+        self.d.move_to_end('d', last=False)
+        self.assertEqual(list(self.d.items()), [('d', 'D'), ('a', 'A'), ('c', 'C'), ('b', 'B')])
+        with self.assertRaises(KeyError):
+            self.d.move_to_end('x')
+
+
+class TestCompactStorage(unittest.TestCase):
+    dict_class = Dict
+
+    def setUp(self):
+        self.d = self.dict_class()
+
+    def test_index_typecode_grows_with_capacity(self):
+        self.assertEqual(self.d.index_list.typecode, 'b')
+        self.assertEqual(list(self.d.index_list), [EMPTY] * 8)
+        for i in range(200):
+            self.d[i] = i
+        self.assertEqual(self.d.max_len, 512)
+        self.assertEqual(self.d.index_list.typecode, 'h')
+
+    def test_entries_are_parallel_arrays(self):
+        self.d['a'] = 1
+        self.d['b'] = 2
+        self.assertEqual(list(self.d.entry_hashes), [hash('a'), hash('b')])
+        self.assertEqual(self.d.entry_keys, ['a', 'b'])
+        self.assertEqual(self.d.entry_values, [1, 2])
+
+    def test_insertion_order_preserved(self):
+        for k in ['z', 'y', 'x']:
+            self.d[k] = k
+        del self.d['y']
+        self.d['y'] = 'y'
+        self.assertEqual(list(self.d.keys()), ['z', 'x', 'y'])
+        self.assertEqual(self.d.entry_keys[1], DELETED)
+
+    def test_resize_drops_deleted_entries(self):
+        for i in range(4):
+            self.d[i] = i
+        del self.d[1]
+        del self.d[2]
+        self.d[10] = 10  # entry arrays are full, triggers a rebuild
+        self.assertEqual(self.d.entry_keys, [0, 3, 10])
+        self.assertEqual(list(self.d.items()), [(0, 0), (3, 3), (10, 10)])
+
+
+class TestProbing(unittest.TestCase):
+    dict_class = Dict
+
+    class EqCountingKey:
+        eq_calls = 0
+
+        def __init__(self, val, hash_val):
+            self.val = val
+            self.hash_val = hash_val
+
+        def __hash__(self):
+            return self.hash_val
+
+        def __eq__(self, other):
+            TestProbing.EqCountingKey.eq_calls += 1
+            return self.val == other.val
+
+    def setUp(self):
+        self.d = self.dict_class()
+        TestProbing.EqCountingKey.eq_calls = 0
+
+    def test_negative_hashes(self):
+        keys = [-i for i in range(2, 500)]
+        for k in keys:
+            self.d[k] = k
+        for k in keys:
+            self.assertEqual(self.d[k], k)
+
+    def test_probe_visits_every_slot(self):
+        # Everything shares the same low bits, so only the perturbation
+        # spreads the chain; the lookup must still find a free slot.
+        keys = [self.EqCountingKey(i, i << 20) for i in range(5)]
+        for k in keys[:4]:
+            self.d[k] = k.val
+        self.assertEqual(self.d.max_len, 8)
+        for k in keys[:4]:
+            self.assertEqual(self.d[k], k.val)
+        self.assertNotIn(keys[4], self.d)
+
+    def test_eq_skipped_on_hash_mismatch(self):
+        keys = [self.EqCountingKey(i, 1 + 8 * i) for i in range(100)]
+        for k in keys:
+            self.d[k] = k.val
+        for k in keys:
+            self.assertEqual(self.d[k], k.val)
+        self.assertEqual(TestProbing.EqCountingKey.eq_calls, 0)
+
+    def test_get_falsy_default(self):
+        self.assertEqual(self.d.get('absent', 0), 0)
+
+
+class TestBulkConstruction(unittest.TestCase):
+    dict_class = Dict
+
+    def test_capacity_presizes(self):
+        d = self.dict_class(capacity=1000)
+        self.assertEqual(d.max_len, 2048)
+        for i in range(1000):
+            d[i] = i
+        self.assertEqual(d.max_len, 2048)
+
+    def test_from_items(self):
+        d = self.dict_class.from_items((str(i), i) for i in range(100))
+        self.assertEqual(len(d), 100)
+        self.assertEqual(d['42'], 42)
+        self.assertEqual(d.max_len, 256)
+
+    def test_from_items_duplicates(self):
+        d = self.dict_class.from_items([('a', 1), ('b', 2), ('a', 3)])
+        self.assertEqual(len(d), 2)
+        self.assertEqual(list(d.items()), [('a', 3), ('b', 2)])
+
+    def test_fromkeys(self):
+        d = self.dict_class.fromkeys(['x', 'y', 'z'], 0)
+        self.assertEqual(list(d.items()), [('x', 0), ('y', 0), ('z', 0)])
+        self.assertIsNone(self.dict_class.fromkeys('ab')['a'])
+
+    def test_update(self):
+        d = self.dict_class()
+        d['a'] = 1
+        d.update({'a': 10, 'b': 20})
+        d.update([('c', 30)], d=40)
+        d.update(self.dict_class.from_items([('e', 50)]))
+        self.assertEqual(list(d.items()), [('a', 10), ('b', 20), ('c', 30), ('d', 40), ('e', 50)])
+
+    def test_update_resizes_once(self):
+        d = self.dict_class()
+        resizes = []
+        original = d._resize
+        d._resize = lambda length: (resizes.append(length), original(length))
+        d.update((i, i) for i in range(500))
+        self.assertEqual(resizes, [1024])
+        self.assertEqual(len(d), 500)
+
+
+class TestCompaction(unittest.TestCase):
+    dict_class = Dict
+
+    def test_tombstones_trigger_compaction(self):
+        d = self.dict_class()
+        for i in range(4):
+            d[i] = i
+        del d[0]
+        del d[1]
+        self.assertEqual(len(d.entry_keys), 4)
+        del d[2]  # 3 of 4 used slots are tombstones
+        self.assertEqual(d.entry_keys, [3])
+        self.assertNotIn(DUMMY, d.index_list)
+        self.assertEqual(d[3], 3)
+
+    def test_compaction_disabled(self):
+        d = self.dict_class(compact_ratio=0)
+        for i in range(4):
+            d[i] = i
+        for i in range(3):
+            del d[i]
+        self.assertEqual(len(d.entry_keys), 4)
+        self.assertEqual(d.index_list.count(DUMMY), 3)
+
+    def test_shrink_when_mostly_empty(self):
+        d = self.dict_class()
+        for i in range(1000):
+            d[i] = i
+        self.assertEqual(d.max_len, 2048)
+        for i in range(990):
+            del d[i]
+        self.assertEqual(d.max_len, 64)
+        self.assertEqual(list(d.items()), [(i, i) for i in range(990, 1000)])
+
+    def test_shrink_disabled(self):
+        d = self.dict_class(shrink_ratio=0, compact_ratio=0)
+        for i in range(1000):
+            d[i] = i
+        for i in range(1000):
+            del d[i]
+        self.assertEqual(d.max_len, 2048)
+
+    def test_churn_reaches_steady_state(self):
+        d = self.dict_class()
+        for i in range(100):
+            d[i] = i
+        sizes = set()
+        for i in range(100, 10000):
+            d[i] = i
+            del d[i - 100]
+            if i >= 1000:
+                sizes.add(d.max_len)
+            self.assertLessEqual(len(d.entry_keys), d.max_len * 2 // 3)
+        self.assertEqual(sizes, {512})
+        self.assertEqual(len(d), 100)
+
+
+class TestViews(unittest.TestCase):
+    dict_class = Dict
+
+    def setUp(self):
+        self.d = self.dict_class.from_items([('a', 1), ('b', 2), ('c', 3)])
+
+    def test_views_are_live(self):
+        keys = self.d.keys()
+        values = self.d.values()
+        items = self.d.items()
+        self.d['d'] = 4
+        del self.d['a']
+        self.assertEqual(len(keys), 3)
+        self.assertEqual(list(keys), ['b', 'c', 'd'])
+        self.assertEqual(list(values), [2, 3, 4])
+        self.assertEqual(list(items), [('b', 2), ('c', 3), ('d', 4)])
+
+    def test_membership(self):
+        self.assertIn('a', self.d.keys())
+        self.assertNotIn('z', self.d.keys())
+        self.assertIn(('a', 1), self.d.items())
+        self.assertNotIn(('a', 2), self.d.items())
+        self.assertIn(3, self.d.values())
+        self.assertNotIn(4, self.d.values())
+
+    def test_keys_set_operations(self):
+        other = self.dict_class.fromkeys(['b', 'c', 'x'])
+        self.assertEqual(self.d.keys() & other.keys(), {'b', 'c'})
+        self.assertEqual(self.d.keys() | {'y'}, {'a', 'b', 'c', 'y'})
+        self.assertEqual(self.d.keys() - other.keys(), {'a'})
+        self.assertEqual(self.d.keys() ^ other.keys(), {'a', 'x'})
+        self.assertTrue(self.d.keys() == {'a', 'b', 'c'})
+        self.assertTrue(self.d.keys().isdisjoint({'q'}))
+
+    def test_repr(self):
+        self.assertEqual(repr(self.d.keys()), "dict_keys(['a', 'b', 'c'])")
+        self.assertEqual(repr(self.d.items()), "dict_items([('a', 1), ('b', 2), ('c', 3)])")
+        self.assertEqual(repr(self.d), "a - 1\nb - 2\nc - 3\n")
+
+    def test_insert_during_iteration(self):
+        with self.assertRaises(RuntimeError):
+            for k in self.d:
+                self.d[k + k] = 0
+
+    def test_delete_during_iteration(self):
+        with self.assertRaises(RuntimeError):
+            for k, v in self.d.items():
+                del self.d[k]
+
+    def test_update_during_iteration_allowed(self):
+        for k in self.d.keys():
+            self.d[k] = 0
+        self.assertEqual(list(self.d.values()), [0, 0, 0])
+
+
+class TestBatchOperations(unittest.TestCase):
+    dict_class = Dict
+
+    def setUp(self):
+        self.d = self.dict_class.from_items((i * 7, str(i)) for i in range(1000))
+        self.d['text'] = 'value'
+
+    def test_get_many(self):
+        keys = [0, 7, 8, 6993, -7, 'text']
+        self.assertEqual(self.d.get_many(keys, default='-'), ['0', '1', '-', '999', '-', 'value'])
+
+    def test_contains_many(self):
+        self.assertEqual(self.d.contains_many([14, 15, 'text']), [True, False, True])
+
+    def test_set_many(self):
+        self.d.set_many([7, 100000, 100000, 'x'], ['a', 'b', 'c', 'd'])
+        self.assertEqual(self.d[7], 'a')
+        self.assertEqual(self.d[100000], 'c')
+        self.assertEqual(self.d['x'], 'd')
+        self.assertEqual(len(self.d), 1003)
+
+    def test_set_many_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.d.set_many(['a', 'b'], [1])
+        self.assertNotIn('a', self.d)
+
+    @unittest.skipIf(np is None, "needs numpy")
+    def test_int_hashes_match_builtin(self):
+        modulus = sys.hash_info.modulus
+        keys = [0, 1, -1, -2, 5, -5, modulus - 1, modulus, modulus + 1, -modulus, -modulus - 1,
+                2 ** 62, -2 ** 63, 2 ** 63 - 1]
+        self.assertEqual(_int_hashes(np.array(keys, dtype=np.int64)).tolist(), [hash(k) for k in keys])
+        unsigned = [0, 2 ** 63, 2 ** 64 - 1, modulus]
+        self.assertEqual(_int_hashes(np.array(unsigned, dtype=np.uint64)).tolist(), [hash(k) for k in unsigned])
+
+    @unittest.skipIf(np is None, "needs numpy")
+    def test_vectorized_matches_per_key(self):
+        modulus = sys.hash_info.modulus
+        d = self.dict_class()
+        for i in range(-500, 500):
+            d[i * 3] = i
+        d[5 + modulus] = 'same hash as 5'
+        del d[30]
+        keys = np.array(list(range(-1600, 1600)) + [5 + modulus, -1, -2], dtype=np.int64)
+        expected = [d.get(int(k), 'missing') for k in keys]
+        result = d.get_many(keys, default='missing')
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual(result.tolist(), expected)
+        self.assertEqual(d.contains_many(keys).tolist(), [e != 'missing' for e in expected])
+
+    @unittest.skipIf(np is None, "needs numpy")
+    def test_vectorized_set_many(self):
+        d = self.dict_class()
+        keys = np.arange(0, 30000, 3)
+        d.set_many(keys, range(len(keys)))
+        d.set_many(np.array([3, 4, 4]), ['x', 'y', 'z'])
+        self.assertEqual(len(d), 10001)
+        self.assertEqual(d[3], 'x')
+        self.assertEqual(d[4], 'z')
+        self.assertIs(type(d.keys().__iter__().__next__()), int)
+        self.assertEqual(d[29997], 9999)
+        with self.assertRaises(ValueError):
+            d.set_many(np.array([1, 2]), [1])
+
+
+
+class TestSerialization(unittest.TestCase):
+    dict_class = Dict
+
+    def setUp(self):
+        self.d = self.dict_class()
+        for i in range(100):
+            self.d[str(i)] = i
+        for i in range(0, 100, 3):
+            del self.d[str(i)]
+        self.d[7.5] = None
+
+    def check_restored(self, restored):
+        self.assertIs(type(restored), type(self.d))
+        self.assertEqual(list(restored.items()), list(self.d.items()))
+        self.assertNotIn('3', restored)
+        restored['new'] = 1
+        self.assertEqual(restored['new'], 1)
+        self.assertEqual(len(restored), len(self.d) + 1)
+
+    def test_pickle_restores_table_as_is(self):
+        restored = pickle.loads(pickle.dumps(self.d))
+        self.assertEqual(restored.index_list, self.d.index_list)
+        self.assertIs(restored.entry_keys[0], DELETED)
+        self.check_restored(restored)
+
+    def test_bytes_round_trip(self):
+        data = self.d.to_bytes()
+        restored = self.dict_class.from_bytes(data)
+        self.assertEqual(restored.index_list, self.d.index_list)
+        self.assertEqual(restored.entry_hashes, self.d.entry_hashes)
+        self.check_restored(restored)
+        with self.assertRaises(ValueError):
+            self.dict_class.from_bytes(b"x" * len(data))
+
+    def test_other_hash_seed_rehashes(self):
+        state = self.d.__getstate__()
+        state['hash_check'] += 1
+        state['entry_hashes'] = state['entry_hashes'][:]
+        for i in range(len(state['entry_hashes'])):
+            state['entry_hashes'][i] ^= 0x5555  # what another seed would have stored
+        restored = self.dict_class.__new__(self.dict_class)
+        restored.__setstate__(state)
+        self.assertEqual(restored['50'], 50)
+        self.assertNotIn(DELETED, restored.entry_keys)
+        self.check_restored(restored)
+
+        data = bytearray(self.d.to_bytes())
+        struct.pack_into("<q", data, 8, struct.unpack_from("<q", data, 8)[0] + 1)
+        self.check_restored(self.dict_class.from_bytes(bytes(data)))
+
 
 # Run the tests
 if __name__ == '__main__':
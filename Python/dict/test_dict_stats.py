@@ -0,0 +1,73 @@
+import json
+import unittest
+import dict_stats
+from dictionary import Dict
+
+
+class TestDictStats(unittest.TestCase):
+
+    def tearDown(self):
+        dict_stats.disable()
+
+    def test_off_by_default(self):
+        d = Dict()
+        for i in range(10):
+            d[i] = i
+        del d[3]
+        stats = d.stats()
+        self.assertFalse(stats["enabled"])
+        self.assertEqual(stats["resizes"], 0)
+        self.assertEqual(stats["probe_histogram"], {"get": {}, "set": {}})
+        self.assertEqual(stats["size"], 9)
+        self.assertEqual(stats["load_factor"], 9 / 32)
+        self.assertEqual(stats["tombstone_ratio"], 0.1)
+        self.assertIs(Dict._lookup, Dict.__dict__["_lookup"])
+        self.assertNotIn("_stats", d.__dict__)
+
+    def test_counts_when_enabled(self):
+        dict_stats.enable()
+        d = Dict()
+        for i in range(5):
+            d[i] = i  # the fifth insert resizes 8 -> 16
+        stats = d.stats()
+        self.assertTrue(stats["enabled"])
+        self.assertEqual(stats["resizes"], 1)
+        self.assertEqual(stats["probe_histogram"]["set"], {"1": 5})
+        self.assertEqual(sum(stats["probe_histogram"]["get"].values()), 0)
+        self.assertEqual(d.get(0), 0)
+        self.assertEqual(d.stats()["probe_histogram"]["get"], {"1": 1})
+        self.assertEqual(json.loads(json.dumps(stats)), stats)
+
+    def test_eq_calls(self):
+        class Key:
+            def __init__(self, v):
+                self.v = v
+
+            def __hash__(self):
+                return 1
+
+            def __eq__(self, other):
+                return self.v == other.v
+
+        dict_stats.enable()
+        d = Dict()
+        keys = [Key(i) for i in range(3)]
+        for k in keys:
+            d[k] = k.v
+        # each new key compares against every key already in its chain
+        self.assertEqual(d.stats()["eq_calls"], 3)
+        self.assertEqual(d[Key(2)], 2)
+        self.assertEqual(d.stats()["eq_calls"], 6)
+
+    def test_disable_restores_methods(self):
+        original = Dict.__dict__["__setitem__"]
+        dict_stats.enable()
+        dict_stats.enable()
+        self.assertIsNot(Dict.__dict__["__setitem__"], original)
+        dict_stats.disable()
+        self.assertIs(Dict.__dict__["__setitem__"], original)
+        self.assertFalse(dict_stats.is_enabled())
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,63 @@
+import unittest
+from dictionary_without_delete import CHUNK_SIZE, Dict
+
+
+class TestArenaDict(unittest.TestCase):
+
+    def setUp(self):
+        self.d = Dict()
+
+    def test_first_entry_is_found(self):
+        # entry index 0 used to read as an empty slot
+        self.d['a'] = 1
+        self.d['b'] = 2
+        self.assertEqual(self.d['a'], 1)
+        self.assertIn('a', self.d)
+        self.d['a'] = 3
+        self.assertEqual(len(self.d), 2)
+        self.assertEqual(self.d.items(), [('a', 3), ('b', 2)])
+
+    def test_negative_hashes(self):
+        for i in range(-50, 50):
+            self.d[i] = i
+        self.assertEqual([self.d[i] for i in range(-50, 50)], list(range(-50, 50)))
+        self.assertIsNone(self.d.get(1000))
+        self.assertEqual(self.d.get(1000, 'x'), 'x')
+
+    def test_resize_keeps_entries_in_place(self):
+        for i in range(3 * CHUNK_SIZE):
+            self.d[str(i)] = i
+        chunks = list(self.d.chunks)
+        self.assertEqual(len(chunks), 3)
+        first = self.d._entry(0)
+        for i in range(3 * CHUNK_SIZE, 6 * CHUNK_SIZE):
+            self.d[str(i)] = i
+        self.assertIs(self.d._entry(0), first)
+        self.assertEqual(self.d.chunks[:3], chunks)
+        self.assertTrue(all(a is b for a, b in zip(self.d.chunks, chunks)))
+        self.assertEqual(self.d['5000'], 5000)
+        self.assertEqual(self.d.keys(), [str(i) for i in range(6 * CHUNK_SIZE)])
+
+    def test_snapshot_ignores_later_writes(self):
+        for i in range(10):
+            self.d[i] = i
+        snap = self.d.snapshot()
+        self.d[3] = 'new'
+        self.d[3] = 'newer'
+        for i in range(10, 1000):  # resizes the index several times
+            self.d[i] = i
+        self.assertEqual(len(snap), 10)
+        self.assertEqual(snap[3], 3)
+        self.assertNotIn(500, snap)
+        self.assertEqual(snap.items(), [(i, i) for i in range(10)])
+        self.assertEqual(self.d[3], 'newer')
+        self.assertEqual(len(self.d), 1000)
+        self.assertEqual(list(self.d)[:4], [0, 1, 2, 3])
+        later = self.d.snapshot()
+        self.d[3] = 'newest'
+        self.assertEqual(later[3], 'newer')
+        self.assertFalse(hasattr(snap, '__setitem__'))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,78 @@
+import unittest
+from dictionary import Dict
+from frozen_dict import FrozenDict
+
+
+class TestFrozenDict(unittest.TestCase):
+
+    def test_freeze(self):
+        d = Dict()
+        for i in range(1000):
+            d[str(i)] = i
+        del d['10']
+        f = d.freeze()
+        self.assertEqual(len(f), 999)
+        for i in range(1000):
+            if i != 10:
+                self.assertEqual(f[str(i)], i)
+        self.assertNotIn('10', f)
+        self.assertNotIn(10, f)
+        self.assertEqual(list(f.items()), list(d.items()))
+
+    def test_every_slot_used_once(self):
+        f = FrozenDict((i * 1024, i) for i in range(500))
+        self.assertEqual(f.n_slots, 500)
+        self.assertEqual(sorted(f.order), list(range(500)))
+        self.assertEqual(f[1024 * 499], 499)
+
+    def test_from_mapping(self):
+        f = FrozenDict({'a': 1, 'b': 2})
+        self.assertEqual(f['a'], 1)
+        self.assertEqual(f.get('c', 3), 3)
+        self.assertEqual(f, {'a': 1, 'b': 2})
+        self.assertNotEqual(f, {'a': 1})
+
+    def test_empty(self):
+        f = FrozenDict()
+        self.assertEqual(len(f), 0)
+        self.assertNotIn('a', f)
+        with self.assertRaises(KeyError):
+            _ = f['a']
+
+    def test_immutable(self):
+        f = FrozenDict({'a': 1})
+        with self.assertRaises(TypeError):
+            f['a'] = 2
+        with self.assertRaises(TypeError):
+            del f['a']
+
+    def test_hash(self):
+        f = FrozenDict({'a': 1, 'b': 2})
+        g = FrozenDict([('b', 2), ('a', 1)])
+        self.assertEqual(hash(f), hash(g))
+        self.assertEqual({f: 'x'}[g], 'x')
+        with self.assertRaises(TypeError):
+            hash(FrozenDict({'a': []}))
+
+    def test_same_hash_keys_overflow(self):
+        class Key:
+            def __init__(self, val):
+                self.val = val
+
+            def __hash__(self):
+                return 42
+
+            def __eq__(self, other):
+                return self.val == other.val
+
+        keys = [Key(i) for i in range(5)]
+        f = FrozenDict((k, k.val) for k in keys)
+        self.assertEqual(len(f), 5)
+        self.assertEqual(len(f.overflow), 4)
+        for k in keys:
+            self.assertEqual(f[k], k.val)
+        self.assertNotIn(Key(5), f)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import pickle
+import unittest
+import test_dict
+from hardened_dict import BUCKET, HardenedDict
+from dictionary import Dict
+
+
+# The whole test_dict.py suite, run against the hardened backend
+
+class TestHardenedDictBasics(test_dict.TestDict):
+    dict_class = HardenedDict
+
+
+class TestHardenedCompactStorage(test_dict.TestCompactStorage):
+    dict_class = HardenedDict
+
+
+class TestHardenedProbing(test_dict.TestProbing):
+    dict_class = HardenedDict
+
+
+class TestHardenedBulkConstruction(test_dict.TestBulkConstruction):
+    dict_class = HardenedDict
+
+
+class TestHardenedCompaction(test_dict.TestCompaction):
+    dict_class = HardenedDict
+
+
+class TestHardenedViews(test_dict.TestViews):
+    dict_class = HardenedDict
+
+
+class TestHardenedBatchOperations(test_dict.TestBatchOperations):
+    dict_class = HardenedDict
+
+
+class WeakHash:
+    # Every instance hashes alike, and instances don't order
+    def __init__(self, n):
+        self.n = n
+
+    def __hash__(self):
+        return 7
+
+    def __eq__(self, other):
+        return isinstance(other, WeakHash) and other.n == self.n
+
+
+class TestHardenedDict(unittest.TestCase):
+
+    def test_backend_selection(self):
+        self.assertIsInstance(Dict(backend="hardened"), HardenedDict)
+
+    def test_ordinary_keys_stay_unkeyed(self):
+        d = HardenedDict.from_items((str(i), i) for i in range(20000))
+        self.assertIsNone(d.seed)
+        self.assertEqual(len(d.buckets), 0)
+
+    def test_low_bit_collisions_switch_to_keyed_hashing(self):
+        d = HardenedDict()
+        for i in range(2000):
+            d[i << 32] = i
+        self.assertIsNotNone(d.seed)
+        self.assertNotEqual(d.entry_hashes[1], hash(1 << 32))
+        self.assertEqual([d[i << 32] for i in range(2000)], list(range(2000)))
+        self.assertEqual(d.get(1.0 * (1 << 32)), 1)
+        restored = pickle.loads(pickle.dumps(d))
+        self.assertEqual([restored[i << 32] for i in range(2000)], list(range(2000)))
+        self.assertEqual(HardenedDict.from_bytes(d.to_bytes())[5 << 32], 5)
+
+    def test_equal_hashes_go_to_an_ordered_bucket(self):
+        modulus = (1 << 61) - 1  # hash(i * modulus) == 0 for every i
+        d = HardenedDict()
+        for i in range(1000):
+            d[i * modulus] = i
+        self.assertEqual(len(d.buckets), 1)
+        bucket = next(iter(d.buckets.values()))
+        self.assertTrue(bucket.ordered)
+        self.assertEqual(bucket.keys, sorted(bucket.keys))
+        self.assertEqual(d._lookup(d._hash(modulus), modulus)[0], BUCKET)
+        for i in range(0, 1000, 2):
+            del d[i * modulus]
+        self.assertEqual(len(d), 500)
+        self.assertEqual([d.get(i * modulus) for i in range(6)], [None, 1, None, 3, None, 5])
+        self.assertEqual(list(d.keys())[:2], [modulus, 3 * modulus])
+
+    def test_unorderable_bucket(self):
+        d = HardenedDict()
+        for i in range(100):
+            d[WeakHash(i)] = i
+        d['other'] = -1
+        self.assertEqual(len(d.buckets), 1)
+        self.assertFalse(next(iter(d.buckets.values())).ordered)
+        self.assertEqual([d[WeakHash(i)] for i in range(100)], list(range(100)))
+        self.assertEqual(d['other'], -1)
+        del d[WeakHash(50)]
+        self.assertNotIn(WeakHash(50), d)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,95 @@
+import unittest
+import test_dict
+from incremental_dict import IncrementalDict
+
+
+class TestIncrementalDictBasics(test_dict.TestDict):
+
+    def setUp(self):
+        self.d = IncrementalDict()
+
+
+class TestIncrementalDict(unittest.TestCase):
+
+    def setUp(self):
+        self.d = IncrementalDict()
+
+    def test_resize_is_spread_over_operations(self):
+        for i in range(9):
+            self.d[i] = i
+        self.assertEqual(self.d.max_len, 16)
+        self.d[9] = 9  # crosses the load factor
+        self.assertTrue(self.d.is_migrating)
+        self.assertEqual(self.d.max_len, 32)
+        self.assertEqual(len(self.d.old_index), 16)
+        for i in range(10):
+            self.assertEqual(self.d[i], i)
+        self.assertFalse(self.d.is_migrating)
+        self.assertEqual(list(self.d.keys()), list(range(10)))
+
+    def test_operations_during_migration(self):
+        for i in range(100):
+            self.d[i] = i
+        for i in range(0, 100, 3):
+            del self.d[i]
+        self.d.migrate_step = 1
+        self.d._start_migration(256)
+        expected = {i: i for i in range(100) if i % 3}
+        for i in range(100, 140):
+            self.d[i] = -i
+            expected[i] = -i
+            self.assertTrue(self.d.is_migrating)
+        for i in range(1, 60, 3):
+            del self.d[i]
+            del expected[i]
+        self.d[2] = 'updated'
+        expected[2] = 'updated'
+        self.assertEqual(list(self.d.items()), list(expected.items()))
+        self.assertEqual(len(self.d), len(expected))
+        for k, v in expected.items():
+            self.assertEqual(self.d[k], v)
+        self.d._finish_migration()
+        self.assertFalse(self.d.is_migrating)
+        self.assertEqual(list(self.d.keys()), list(expected))
+        for k, v in expected.items():
+            self.assertEqual(self.d[k], v)
+        self.assertNotIn(0, self.d)
+
+    def test_many_operations(self):
+        expected = {}
+        for i in range(5000):
+            self.d[i] = i
+            expected[i] = i
+            if i % 4 == 0:
+                del self.d[i // 2]
+                del expected[i // 2]
+        self.assertEqual(len(self.d), len(expected))
+        self.assertEqual(list(self.d.items()), list(expected.items()))
+
+    def test_deletes_compact_incrementally(self):
+        for i in range(1000):
+            self.d[i] = i
+        for i in range(990):
+            del self.d[i]
+        self.d._finish_migration()
+        self.assertEqual(self.d.max_len, 64)
+        self.assertEqual(list(self.d.keys()), list(range(990, 1000)))
+        self.assertLess(len(self.d.entry_keys), 64 * 2 // 3)
+
+    def test_iteration_with_lookups_during_migration(self):
+        for i in range(100):
+            self.d[i] = i
+        for i in range(0, 100, 2):
+            del self.d[i]
+        self.d._start_migration(256)
+        self.assertEqual([self.d[k] for k in self.d], list(range(1, 100, 2)))
+
+    def test_get_many_during_migration(self):
+        for i in range(100):
+            self.d[i] = i
+        self.d._start_migration(256)
+        self.assertEqual(self.d.get_many([5, 50, 500]), [5, 50, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
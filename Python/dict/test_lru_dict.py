@@ -0,0 +1,49 @@
+import unittest
+from lru_dict import LRUDict
+
+
+class TestLRUDict(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUDict(maxsize=3)
+
+    def test_evicts_least_recently_used(self):
+        for k in 'abc':
+            self.cache[k] = k.upper()
+        self.assertEqual(self.cache['a'], 'A')  # a is now the newest
+        self.cache['d'] = 'D'
+        self.assertNotIn('b', self.cache)
+        self.assertEqual(list(self.cache.keys()), ['c', 'a', 'd'])
+        self.cache['c'] = 'C2'  # updating counts as a use
+        self.cache['e'] = 'E'
+        self.assertEqual(list(self.cache.items()), [('d', 'D'), ('c', 'C2'), ('e', 'E')])
+
+    def test_hit_and_miss_counters(self):
+        self.cache['a'] = 1
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('b'))
+        with self.assertRaises(KeyError):
+            self.cache['b']
+        self.assertIn('a', self.cache)  # membership is not a use
+        self.assertEqual(self.cache.cache_info(), {"hits": 1, "misses": 2, "maxsize": 3, "currsize": 1})
+
+    def test_bulk_load_evicts(self):
+        cache = LRUDict(maxsize=4)
+        cache.update((i, i) for i in range(10))
+        self.assertEqual(list(cache.keys()), [6, 7, 8, 9])
+
+    def test_long_run_stays_small(self):
+        cache = LRUDict(maxsize=100)
+        for i in range(20000):
+            cache[i % 150] = i
+            cache.get(i % 7)
+        self.assertEqual(len(cache), 100)
+        self.assertLessEqual(cache.max_len, 512)
+
+    def test_maxsize_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            LRUDict(maxsize=0)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import mmap_dict
+from mmap_dict import MmapDict
+
+
+class TestMmapDict(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.items = [(f"key{i}", f"value{i}") for i in range(1000)] + [(b"raw", b"\x00\x01"), (-5, "neg"), (2 ** 70, "big")]
+        mmap_dict.write(self.path, self.items)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_lookups(self):
+        with MmapDict(self.path) as d:
+            self.assertEqual(len(d), 1003)
+            self.assertEqual(bytes(d["key42"]), b"value42")
+            self.assertEqual(bytes(d[b"raw"]), b"\x00\x01")
+            self.assertEqual(bytes(d[-5]), b"neg")
+            self.assertEqual(bytes(d[2 ** 70]), b"big")
+            self.assertIn("key999", d)
+            self.assertNotIn("key1000", d)
+            self.assertNotIn(b"key1", d)  # bytes and str keys are distinct
+            self.assertIsNone(d.get(7))
+            with self.assertRaises(KeyError):
+                d["missing"]
+            with self.assertRaises(TypeError):
+                d[1.5]
+
+    def test_values_are_views(self):
+        with MmapDict(self.path) as d:
+            v = d["key1"]
+            self.assertIsInstance(v, memoryview)
+            self.assertTrue(v.readonly)
+            self.assertEqual(v.tobytes(), b"value1")
+            v.release()
+
+    def test_items_in_order(self):
+        with MmapDict(self.path) as d:
+            items = [(k, bytes(v)) for k, v in d.items()]
+        expected = [(k, v if isinstance(v, bytes) else v.encode()) for k, v in self.items]
+        self.assertEqual(items, expected)
+
+    def test_repeated_keys(self):
+        mmap_dict.write(self.path, [("a", "1"), ("b", "2"), ("a", "3")])
+        with MmapDict(self.path) as d:
+            self.assertEqual(len(d), 2)
+            self.assertEqual(bytes(d["a"]), b"3")
+
+    def test_readable_under_another_hash_seed(self):
+        code = f"from mmap_dict import MmapDict; print(bytes(MmapDict({self.path!r})['key7']).decode())"
+        env = dict(os.environ, PYTHONHASHSEED="123")
+        out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(mmap_dict.__file__)))
+        self.assertEqual(out.stdout.strip(), "value7")
+
+    def test_not_a_dict_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * 100)
+        with self.assertRaises(ValueError):
+            MmapDict(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,95 @@
+import random
+import unittest
+import test_dict
+from dictionary import Dict, EMPTY, HASH_MASK
+from robin_hood_dict import RobinHoodDict
+
+
+class TestRobinHoodDictBasics(test_dict.TestDict):
+
+    def setUp(self):
+        self.d = Dict(backend="robinhood")
+
+
+class TestRobinHoodDict(unittest.TestCase):
+
+    def check_invariants(self, d):
+        mask = d.max_len - 1
+        for i, ix in enumerate(d.index_list):
+            if ix == EMPTY:
+                continue
+            home = d.entry_hashes[ix] & HASH_MASK & mask
+            self.assertEqual(d.dist[i], (i - home) & mask)
+            # the slot before a displaced entry is never empty
+            if d.dist[i]:
+                self.assertNotEqual(d.index_list[(i - 1) & mask], EMPTY)
+                self.assertGreaterEqual(d.dist[(i - 1) & mask], d.dist[i] - 1)
+
+    def test_high_load(self):
+        d = RobinHoodDict(max_load=0.9)
+        for i in range(900):
+            d[i * 8] = i
+        self.assertEqual(d.max_len, 1024)
+        self.check_invariants(d)
+        self.assertEqual([d[i * 8] for i in range(900)], list(range(900)))
+        self.assertNotIn(7, d)
+
+    def test_delete_leaves_no_tombstones(self):
+        d = RobinHoodDict(max_load=0.9, compact_ratio=0)
+        rng = random.Random(1)
+        keys = [rng.getrandbits(40) for _ in range(800)]
+        for k in keys:
+            d[k] = k
+        rng.shuffle(keys)
+        for k in keys[:400]:
+            del d[k]
+        self.assertEqual(sum(1 for ix in d.index_list if ix != EMPTY), 400)
+        self.check_invariants(d)
+        for k in keys[400:]:
+            self.assertEqual(d[k], k)
+        for k in keys[:400]:
+            self.assertNotIn(k, d)
+
+    def test_growth(self):
+        d = RobinHoodDict()
+        for i in range(20):
+            d[i] = i
+        self.assertEqual(d.max_len, 32)
+        self.assertEqual(list(d.items()), [(i, i) for i in range(20)])
+        self.check_invariants(d)
+
+    def test_churn_compacts_in_place(self):
+        d = RobinHoodDict(max_load=0.9, compact_ratio=0)
+        for i in range(400):
+            d[i] = i
+        self.assertEqual(d.max_len, 512)
+        # dead entries pile up to 60 by the 0.9 threshold, enough to rebuild in place
+        for i in range(400, 1200):
+            del d[i - 400]
+            d[i] = i
+        self.assertEqual(d.max_len, 512)
+        self.assertEqual(len(d), 400)
+        self.check_invariants(d)
+
+    def test_bulk_load_respects_max_load(self):
+        d = RobinHoodDict.from_items((i, i) for i in range(100))
+        self.assertLess(len(d), d.max_len * d.max_load)
+        d = RobinHoodDict(max_load=0.5)
+        d.update((i, i) for i in range(100))
+        self.assertLess(len(d.entry_keys), d.max_len * 0.5)
+        self.check_invariants(d)
+
+    def test_probe_lengths(self):
+        d = RobinHoodDict()
+        self.assertEqual(d.probe_lengths(), (0.0, 0))
+        for i in range(3):
+            d[i * 8] = i  # same home slot
+        self.assertEqual(d.probe_lengths(), (2.0, 3))
+
+    def test_bad_max_load(self):
+        with self.assertRaises(ValueError):
+            RobinHoodDict(max_load=1)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
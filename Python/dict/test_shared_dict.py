@@ -0,0 +1,87 @@
+import multiprocessing
+import unittest
+from shared_dict import SharedDict
+
+
+def _write_range(d, start, stop):
+    for i in range(start, stop):
+        d[i] = [i]
+
+
+_shared = None
+
+
+def _attach(d):
+    global _shared
+    _shared = d
+
+
+def _sum_values(keys):
+    return sum(_shared[k][0] for k in keys)
+
+
+class TestSharedDict(unittest.TestCase):
+
+    def setUp(self):
+        self.d = SharedDict()
+
+    def tearDown(self):
+        self.d.unlink()
+
+    def test_basic_operations(self):
+        for i in range(100):
+            self.d[i] = str(i)
+        self.d['a'] = {'nested': [1, 2]}
+        self.assertEqual(len(self.d), 101)
+        self.assertEqual(self.d[42], '42')
+        self.assertEqual(self.d['a'], {'nested': [1, 2]})
+        self.assertIsNone(self.d.get(100))
+        self.d[42] = 'forty two'
+        self.assertEqual(self.d[42], 'forty two')
+        del self.d[0]
+        self.assertNotIn(0, self.d)
+        with self.assertRaises(KeyError):
+            self.d[0]
+        with self.assertRaises(KeyError):
+            del self.d[0]
+        self.assertEqual(self.d.keys()[:3], [1, 2, 3])
+        self.assertEqual(self.d.keys()[-1], 'a')
+
+    def test_resize_publishes_a_new_generation(self):
+        reader = SharedDict(self.d.name)
+        self.d[0] = 0
+        self.assertEqual(reader[0], 0)
+        first = reader._generation
+        for i in range(1000):
+            self.d[i] = 'x' * 50
+        self.assertEqual(reader[999], 'x' * 50)
+        self.assertGreater(reader._generation, first)
+        self.assertEqual(len(reader), 1000)
+        reader.close()
+
+    def test_attached_without_lock_is_read_only(self):
+        self.d['k'] = 1
+        reader = SharedDict(self.d.name)
+        self.assertEqual(reader['k'], 1)
+        with self.assertRaises(TypeError):
+            reader['k'] = 2
+        reader.close()
+
+    def test_writer_in_another_process(self):
+        self.d[-1] = None
+        process = multiprocessing.Process(target=_write_range, args=(self.d, 0, 500))
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(len(self.d), 501)
+        self.assertEqual(self.d[499], [499])
+
+    def test_pool_readers(self):
+        _write_range(self.d, 0, 200)
+        with multiprocessing.Pool(2, initializer=_attach, initargs=(self.d,)) as pool:
+            totals = pool.map(_sum_values, [range(0, 100), range(100, 200)])
+        self.assertEqual(sum(totals), sum(range(200)))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
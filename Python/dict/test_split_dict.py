@@ -0,0 +1,85 @@
+import unittest
+from split_dict import SharedKeys, SplitDict
+
+
+class TestSplitDict(unittest.TestCase):
+
+    def setUp(self):
+        self.shared = SharedKeys()
+
+    def make(self, **items):
+        d = SplitDict(self.shared)
+        for k, v in items.items():
+            d[k] = v
+        return d
+
+    def test_instances_share_keys(self):
+        a = self.make(name='a', age=1)
+        b = self.make(name='b', age=2)
+        self.assertTrue(a.is_split and b.is_split)
+        self.assertEqual(self.shared.entry_keys, ['name', 'age'])
+        self.assertEqual(b.value_list, ['b', 2])
+        self.assertEqual(a['name'], 'a')
+        self.assertEqual(b['age'], 2)
+        self.assertEqual(len(b), 2)
+
+    def test_missing_keys(self):
+        a = self.make(name='a', age=1, city='x')
+        b = self.make(name='b')
+        self.assertTrue(b.is_split)
+        self.assertNotIn('age', b)
+        with self.assertRaises(KeyError):
+            _ = b['city']
+        self.assertIsNone(b.get('city'))
+        b['city'] = 'y'  # skipping 'age' keeps the shared order
+        self.assertTrue(b.is_split)
+        self.assertEqual(list(b.items()), [('name', 'b'), ('city', 'y')])
+        self.assertEqual(list(a.keys()), ['name', 'age', 'city'])
+
+    def test_delete(self):
+        a = self.make(name='a', age=1)
+        del a['age']
+        self.assertEqual(len(a), 1)
+        self.assertNotIn('age', a)
+        a['age'] = 2  # still in order, last live key is 'name'
+        self.assertTrue(a.is_split)
+        with self.assertRaises(KeyError):
+            del a['missing']
+
+    def test_out_of_order_insert_combines(self):
+        self.make(name='a', age=1)
+        b = self.make(age=2)
+        self.assertTrue(b.is_split)
+        b['name'] = 'b'
+        self.assertFalse(b.is_split)
+        self.assertEqual(list(b.items()), [('age', 2), ('name', 'b')])
+        self.assertEqual(self.shared.entry_keys, ['name', 'age'])
+
+    def test_diverging_keys_combine(self):
+        self.make(name='a', age=1)
+        b = self.make(name='b')
+        b['email'] = 'e'
+        self.assertFalse(b.is_split)
+        self.assertEqual(self.shared.entry_keys, ['name', 'age'])
+        b['x'] = 1
+        del b['name']
+        self.assertEqual(list(b.items()), [('email', 'e'), ('x', 1)])
+
+    def test_shared_keys_limit(self):
+        d = SplitDict(self.shared)
+        for i in range(SharedKeys.max_keys + 5):
+            d[f'k{i}'] = i
+        self.assertFalse(d.is_split)
+        self.assertEqual(len(self.shared), SharedKeys.max_keys)
+        self.assertEqual(d['k34'], 34)
+        self.assertEqual(len(d), SharedKeys.max_keys + 5)
+
+    def test_modification_during_iteration(self):
+        d = self.make(name='a', age=1)
+        with self.assertRaises(RuntimeError):
+            for k in d:
+                d['new'] = 0
+
+
+if __name__ == '__main__':
+    unittest.main()
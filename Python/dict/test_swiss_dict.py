@@ -0,0 +1,91 @@
+import unittest
+import test_dict
+from dictionary import Dict
+from incremental_dict import IncrementalDict
+from swiss_dict import EMPTY_CTRL, DELETED_CTRL, SwissDict
+
+
+# The whole test_dict.py suite, run against the swiss backend
+
+class TestSwissDictBasics(test_dict.TestDict):
+    dict_class = SwissDict
+
+
+class TestSwissCompactStorage(test_dict.TestCompactStorage):
+    dict_class = SwissDict
+
+
+class TestSwissProbing(test_dict.TestProbing):
+    dict_class = SwissDict
+
+
+class TestSwissBulkConstruction(test_dict.TestBulkConstruction):
+    dict_class = SwissDict
+
+
+class TestSwissCompaction(test_dict.TestCompaction):
+    dict_class = SwissDict
+
+
+class TestSwissViews(test_dict.TestViews):
+    dict_class = SwissDict
+
+
+class TestSwissBatchOperations(test_dict.TestBatchOperations):
+    dict_class = SwissDict
+
+
+class TestSwissDict(unittest.TestCase):
+
+    def test_backend_selection(self):
+        self.assertIsInstance(Dict(backend="swiss"), SwissDict)
+        self.assertIsInstance(Dict(backend="incremental"), IncrementalDict)
+        self.assertIs(type(Dict()), Dict)
+        self.assertIsInstance(SwissDict.from_items([(1, 2)]), SwissDict)
+        with self.assertRaises(ValueError):
+            Dict(backend="nope")
+        with self.assertRaises(TypeError):
+            IncrementalDict(backend="swiss")
+
+    def test_fills_to_seven_eighths(self):
+        d = Dict(backend="swiss", max_load=7 / 8)
+        for i in range(111):
+            d[i] = i
+        self.assertEqual(d.max_len, 128)
+        d[111] = 111
+        self.assertEqual(d.max_len, 256)
+        self.assertEqual([d[i] for i in range(112)], list(range(112)))
+        with self.assertRaises(ValueError):
+            SwissDict(max_load=1)
+
+    def test_control_bytes_track_slots(self):
+        d = Dict(backend="swiss")
+        for i in range(100):
+            d[i] = i
+        full = sum(1 for c in d.ctrl if c < 0x80)
+        self.assertEqual(full, 100)
+        for i in range(0, 100, 2):
+            del d[i]
+        self.assertEqual(len(d), 50)
+        for i in range(100):
+            self.assertEqual(i in d, i % 2 == 1)
+        live = [d.index_list[s] for s, c in enumerate(d.ctrl) if c < 0x80]
+        self.assertEqual(sorted(d.entry_keys[ix] for ix in live), list(range(1, 100, 2)))
+        self.assertTrue(all(c in (EMPTY_CTRL, DELETED_CTRL) or c < 0x80 for c in d.ctrl))
+
+    def test_colliding_hashes(self):
+        d = Dict(backend="swiss")
+        keys = [i * 2 ** 61 for i in range(1, 40)]
+        for k in keys:
+            d[k] = -k
+        self.assertEqual([d[k] for k in keys], [-k for k in keys])
+        self.assertIsNone(d.get(41 * 2 ** 61))
+
+    def test_bulk_and_batch(self):
+        d = SwissDict.from_items((str(i), i) for i in range(1000))
+        self.assertEqual(d["999"], 999)
+        self.assertEqual(list(d.get_many(["1", "x", "2"])), [1, None, 2])
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -1,12 +1,23 @@
+import random
+import sys
+import tracemalloc
+from array import array
 from collections import defaultdict, deque
+from time import perf_counter
 
 
 class TreeNode:
+    version = 0  # bumped by every change to any node, so LCAIndex can tell it's stale
+
     def __init__(self, value):
         self.left = None
         self.right = None
         self.value = value
 
+    def __setattr__(self, name, value):
+        TreeNode.version += 1
+        super().__setattr__(name, value)
+
     def __repr__(self):
         return str(self.value)
 
@@ -23,13 +34,28 @@ class TreeNode:
 class Tree:
     def __init__(self, root):
         self.root = root
+        self._lca_index = None
+
+    def build_lca_index(self):
+        """
+        Precompute an LCAIndex, which lca, root_to_node and distance then use
+        until any node is changed
+        """
+        self._lca_index = LCAIndex(self.root)
+        return self._lca_index
+
+    def _index(self):
+        index = self._lca_index
+        if index is not None and (index.version != TreeNode.version or index.root is not self.root):
+            index = self._lca_index = None
+        return index
 
     def __eq__(self, other):
         return self.pre_order() == other.pre_order()
 
     def level_order(self):
         res = []
-        queue = deque([root])
+        queue = deque([self.root])
         while queue:
             node = queue.popleft()
             res.append(node)
@@ -74,7 +100,109 @@ class Tree:
                 stack.append(node.left)
             if node.right:
                 stack.append(node.right)
-        return list(reversed(ans))
+        ans.reverse()
+        return ans
+
+    # Lazy versions of the traversals above: they yield as they go, so a
+    # caller can stop early without the rest being built
+
+    def iter_level_order(self):
+        queue = deque([self.root])
+        while queue:
+            node = queue.popleft()
+            yield node
+            if node.left:
+                queue.append(node.left)
+            if node.right:
+                queue.append(node.right)
+
+    def iter_pre_order(self):
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.right:
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
+
+    def iter_in_order(self):
+        curr = self.root
+        stack = []
+        while stack or curr:
+            while curr:
+                stack.append(curr)
+                curr = curr.left
+            curr = stack.pop()
+            yield curr
+            curr = curr.right
+
+    def iter_post_order(self):
+        # One stack holding the path from the root; a node is yielded once
+        # the child we came back from is its last one
+        stack = []
+        curr = self.root
+        last = None
+        while stack or curr:
+            while curr:
+                stack.append(curr)
+                curr = curr.left
+            node = stack[-1]
+            if node.right and node.right is not last:
+                curr = node.right
+            else:
+                yield node
+                last = stack.pop()
+
+    def iter_zig_zag(self):
+        level = [self.root]
+        even = False
+        while level:
+            yield level[::-1] if even else level
+            level = [child for node in level for child in (node.left, node.right) if child]
+            even = not even
+
+    def _morris(self, pre):
+        # Threads each node's in-order predecessor back to it instead of
+        # keeping a stack, and removes the thread on the way back up
+        curr = self.root
+        while curr:
+            if curr.left is None:
+                yield curr
+                curr = curr.right
+                continue
+            pred = curr.left
+            while pred.right and pred.right is not curr:
+                pred = pred.right
+            if pred.right is None:
+                pred.right = curr
+                if pre:
+                    yield curr
+                curr = curr.left
+            else:
+                pred.right = None
+                if not pre:
+                    yield curr
+                curr = curr.right
+
+    def _morris_iter(self, pre):
+        walk = self._morris(pre)
+        try:
+            # Not yield from, which would close walk along with this generator
+            for node in walk:
+                yield node
+        finally:
+            # Stopped early: finish the walk so that no thread is left behind
+            for _ in walk:
+                pass
+
+    def morris_in_order(self):
+        """in_order in O(1) extra memory; the tree is modified while it runs"""
+        return self._morris_iter(False)
+
+    def morris_pre_order(self):
+        """pre_order in O(1) extra memory; the tree is modified while it runs"""
+        return self._morris_iter(True)
 
     def height(self):
         def find_height(node):
@@ -243,7 +371,6 @@ class Tree:
                 q.append([node.left, y - 1])
             if node.right:
                 q.append([node.right, y + 1])
-        print(d)
         ans = []
         for k in sorted(d.keys()):
             ans.append(d[k])
@@ -278,13 +405,16 @@ class Tree:
         return traverse_lr(self.root.left) == traverse_rl(self.root.right)
 
     def root_to_node(self, node):
+        index = self._index()
+        if index is not None:
+            return index.root_to_node(node)
         path = []
 
         def find_recurse(curr):
             if curr is None:
                 return False
             if curr.value == node:
-                path.append(node)
+                path.append(curr)
                 return True
             path.append(curr)
             if find_recurse(curr.left):
@@ -298,22 +428,407 @@ class Tree:
         return path
 
     def lca(self, a, b):
+        index = self._index()
+        if index is not None:
+            return index.lca(a, b)
         ancestor = None
 
         def find_recurse(node):
             if node is None:
-                return False
+                return None
 
             if node.value in (a, b):
-                return node.value
+                return node
             lr = find_recurse(node.left)
             rr = find_recurse(node.right)
-            if lr and rr:
+            if lr is not None and rr is not None:
                 return node
-            return lr or rr
+            return rr if lr is None else lr
 
         return find_recurse(self.root)
 
+    def distance(self, a, b):
+        """Number of edges between the nodes holding a and b"""
+        index = self._index()
+        if index is not None:
+            return index.distance(a, b)
+        pa = self.root_to_node(a)
+        pb = self.root_to_node(b)
+        if not pa or not pb:
+            raise KeyError(a if not pa else b)
+        common = 0
+        for x, y in zip(pa, pb):
+            if x is not y:
+                break
+            common += 1
+        return len(pa) + len(pb) - 2 * common
+
+
+class LCAIndex:
+    """
+    Ancestor queries on a fixed tree. Nodes are numbered in pre-order, with
+    their parent and depth; an Euler tour lists a node each time the walk
+    passes through it, and a sparse table holds the minimum depth over every
+    power-of-two stretch of the tour. The lowest common ancestor of a and b
+    is the shallowest node between their first visits: two overlapping table
+    lookups, O(1). Tour entries are depth << 32 | node, so min() picks it.
+
+    Values map to their first node in pre-order, as Tree's searches find
+    them. The index is stale once any TreeNode changes; Tree then goes back
+    to walking the tree.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.version = TreeNode.version
+        self.nodes = []
+        self.ids = {}
+        self.parent = []
+        self.depth = []
+        self.first = []
+        euler = []
+        stack = [(root, -1)]
+        while stack:
+            node, p = stack.pop()
+            if node is None:
+                # Back in p from one of its children
+                euler.append(self.depth[p] << 32 | p)
+                continue
+            i = len(self.nodes)
+            d = self.depth[p] + 1 if p >= 0 else 0
+            self.nodes.append(node)
+            self.ids.setdefault(node.value, i)
+            self.parent.append(p)
+            self.depth.append(d)
+            self.first.append(len(euler))
+            euler.append(d << 32 | i)
+            if node.right:
+                stack.append((None, i))
+                stack.append((node.right, i))
+            if node.left:
+                stack.append((None, i))
+                stack.append((node.left, i))
+        # table[k][j] is the minimum of euler[j:j + 2 ** k]
+        self.table = [euler]
+        half = 1
+        while 2 * half <= len(euler):
+            prev = self.table[-1]
+            self.table.append(list(map(min, prev, prev[half:])))
+            half *= 2
+
+    def _id(self, value):
+        i = self.ids.get(value)
+        if i is None:
+            raise KeyError(value)
+        return i
+
+    def _lca_id(self, i, j):
+        lo, hi = self.first[i], self.first[j]
+        if lo > hi:
+            lo, hi = hi, lo
+        k = (hi - lo + 1).bit_length() - 1
+        row = self.table[k]
+        return min(row[lo], row[hi - (1 << k) + 1]) & 0xFFFFFFFF
+
+    def lca(self, a, b):
+        i = self.ids.get(a)
+        j = self.ids.get(b)
+        if i is None or j is None:
+            # Like Tree.lca, whichever of the two is in the tree, if any
+            found = i if j is None else j
+            return None if found is None else self.nodes[found]
+        return self.nodes[self._lca_id(i, j)]
+
+    def root_to_node(self, value):
+        i = self.ids.get(value)
+        path = []
+        while i is not None and i >= 0:
+            path.append(self.nodes[i])
+            i = self.parent[i]
+        path.reverse()
+        return path
+
+    def distance(self, a, b):
+        i = self._id(a)
+        j = self._id(b)
+        depth = self.depth
+        return depth[i] + depth[j] - 2 * depth[self._lca_id(i, j)]
+
+
+class ArrayTree:
+    """
+    Tree stored as parallel arrays: node i has value[i] and children left[i]
+    and right[i] (-1 for none), with the root at 0. left and right are int32
+    arrays, so np.frombuffer(t.left, dtype=np.int32) views them without a
+    copy; values are int64 when they all fit, else a list.
+
+    Children always come after their parent (from_tree numbers nodes in
+    level order), so the bottom-up methods are one reverse pass over the
+    arrays with no recursion. Methods that return nodes on Tree return
+    values here.
+    """
+
+    def __init__(self, left, right, value):
+        self.left = left
+        self.right = right
+        self.value = value
+
+    def __len__(self):
+        return len(self.left)
+
+    def __eq__(self, other):
+        if isinstance(other, Tree):
+            other = ArrayTree.from_tree(other)
+        return self.pre_order() == other.pre_order()
+
+    @classmethod
+    def from_tree(cls, tree):
+        left = array("i")
+        right = array("i")
+        values = []
+        queue = deque([tree.root])
+        while queue:
+            node = queue.popleft()
+            values.append(node.value)
+            n = len(values) + len(queue)
+            left.append(n if node.left else -1)
+            if node.left:
+                queue.append(node.left)
+                n += 1
+            right.append(n if node.right else -1)
+            if node.right:
+                queue.append(node.right)
+        try:
+            value = array("q", values)
+        except (TypeError, OverflowError):
+            value = values
+        return cls(left, right, value)
+
+    def to_tree(self):
+        nodes = [TreeNode(v) for v in self.value]
+        for node, l, r in zip(nodes, self.left, self.right):
+            if l >= 0:
+                node.left = nodes[l]
+            if r >= 0:
+                node.right = nodes[r]
+        return Tree(nodes[0])
+
+    def level_order(self):
+        return [self.value[i] for i in self._level_indices()]
+
+    def pre_order(self):
+        return [self.value[i] for i in self._pre_order_indices()]
+
+    def in_order(self):
+        left, right, value = self.left, self.right, self.value
+        res = []
+        curr = 0
+        stack = []
+        while stack or curr >= 0:
+            while curr >= 0:
+                stack.append(curr)
+                curr = left[curr]
+            curr = stack.pop()
+            res.append(value[curr])
+            curr = right[curr]
+        return res
+
+    def post_order(self):
+        left, right, value = self.left, self.right, self.value
+        stack = [0]
+        ans = []
+        while stack:
+            i = stack.pop()
+            ans.append(value[i])
+            if left[i] >= 0:
+                stack.append(left[i])
+            if right[i] >= 0:
+                stack.append(right[i])
+        ans.reverse()
+        return ans
+
+    def _heights(self):
+        # Height of every subtree; index -1 reads the extra 0 at the end
+        left, right = self.left, self.right
+        h = array("i", bytes(4 * (len(left) + 1)))
+        for i in range(len(left) - 1, -1, -1):
+            lh = h[left[i]]
+            rh = h[right[i]]
+            h[i] = 1 + (lh if lh > rh else rh)
+        return h
+
+    def height(self):
+        return self._heights()[0]
+
+    def is_balanced(self):
+        h = self._heights()
+        return all(abs(h[l] - h[r]) <= 1 for l, r in zip(self.left, self.right))
+
+    @property
+    def diameter(self):
+        h = self._heights()
+        return max(h[l] + h[r] for l, r in zip(self.left, self.right))
+
+    @property
+    def max_path_sum(self):
+        left, right, value = self.left, self.right, self.value
+        s = [0] * (len(left) + 1)
+        for i in range(len(left) - 1, -1, -1):
+            s[i] = max(0, s[left[i]], s[right[i]]) + value[i]
+        return max(0, max(s[:-1]))
+
+    def zig_zag(self):
+        left, right, value = self.left, self.right, self.value
+        level = [0]
+        ans = []
+        even = False
+        while level:
+            ans.append([value[i] for i in (reversed(level) if even else level)])
+            level = [c for i in level for c in (left[i], right[i]) if c >= 0]
+            even = not even
+        return ans
+
+    def _pre_order_indices(self):
+        left, right = self.left, self.right
+        res = []
+        stack = [0]
+        while stack:
+            i = stack.pop()
+            res.append(i)
+            if right[i] >= 0:
+                stack.append(right[i])
+            if left[i] >= 0:
+                stack.append(left[i])
+        return res
+
+    def boundary_traversal(self):
+        left, right, value = self.left, self.right, self.value
+        ans = []
+        i = 0
+        while i >= 0:
+            if left[i] >= 0 or right[i] >= 0:
+                ans.append(value[i])
+            i = left[i] if left[i] >= 0 else right[i]
+        # Leaves come in the same order in every depth-first traversal
+        ans += [value[j] for j in self._pre_order_indices() if left[j] < 0 and right[j] < 0]
+        rside = []
+        i = right[0]
+        while i >= 0:
+            if left[i] >= 0 or right[i] >= 0:
+                rside.append(value[i])
+            i = right[i] if right[i] >= 0 else left[i]
+        return ans + rside[::-1]
+
+    def vertical_order(self):
+        left, right, value = self.left, self.right, self.value
+        d = defaultdict(lambda: defaultdict(list))
+        stack = [(0, 0, 0)]
+        while stack:
+            i, x, y = stack.pop()
+            d[y][x].append(value[i])
+            if left[i] >= 0:
+                stack.append((left[i], x + 1, y - 1))
+            if right[i] >= 0:
+                stack.append((right[i], x + 1, y + 1))
+        return [[v for x in sorted(d[y]) for v in sorted(d[y][x])] for y in sorted(d)]
+
+    def _columns(self):
+        # (column, index) of every node, in level order
+        left, right = self.left, self.right
+        col = [0] * len(left)
+        for i in range(len(left)):
+            if left[i] >= 0:
+                col[left[i]] = col[i] - 1
+            if right[i] >= 0:
+                col[right[i]] = col[i] + 1
+        return self._level_indices(), col
+
+    def _level_indices(self):
+        res = []
+        queue = deque([0])
+        while queue:
+            i = queue.popleft()
+            res.append(i)
+            if self.left[i] >= 0:
+                queue.append(self.left[i])
+            if self.right[i] >= 0:
+                queue.append(self.right[i])
+        return res
+
+    def top_view(self):
+        order, col = self._columns()
+        d = {}
+        for i in order:
+            d.setdefault(col[i], self.value[i])
+        return [d[k] for k in sorted(d)]
+
+    def bottom_view(self):
+        order, col = self._columns()
+        d = {}
+        for i in order:
+            d[col[i]] = self.value[i]
+        return [d[k] for k in sorted(d)]
+
+    @property
+    def is_symmetric(self):
+        left, right, value = self.left, self.right, self.value
+
+        def traverse(i, first, second):
+            res = []
+            stack = [i] if i >= 0 else []
+            while stack:
+                i = stack.pop()
+                res.append(value[i])
+                if first[i] >= 0:
+                    stack.append(first[i])
+                if second[i] >= 0:
+                    stack.append(second[i])
+            return res
+
+        return traverse(left[0], left, right) == traverse(right[0], right, left)
+
+    def _parents(self):
+        parent = array("i", [-1]) * len(self.left)
+        for i, (l, r) in enumerate(zip(self.left, self.right)):
+            if l >= 0:
+                parent[l] = i
+            if r >= 0:
+                parent[r] = i
+        return parent
+
+    def _find(self, value):
+        # First node holding value in level order, so with duplicate values
+        # the path found can differ from Tree's depth-first one
+        try:
+            return self.value.index(value)
+        except (ValueError, TypeError, OverflowError):
+            return -1
+
+    def root_to_node(self, value):
+        i = self._find(value)
+        if i < 0:
+            return []
+        parent = self._parents()
+        path = []
+        while i >= 0:
+            path.append(self.value[i])
+            i = parent[i]
+        path.reverse()
+        return path
+
+    def lca(self, a, b):
+        ia, ib = self._find(a), self._find(b)
+        if ia < 0 or ib < 0:
+            return a if ia >= 0 else b if ib >= 0 else None
+        parent = self._parents()
+        ancestors = set()
+        while ia >= 0:
+            ancestors.add(ia)
+            ia = parent[ia]
+        while ib not in ancestors:
+            ib = parent[ib]
+        return self.value[ib]
+
 
 root = TreeNode(5)
 root.left = TreeNode(2)
@@ -350,3 +865,125 @@ print("Is Symmetric - ", st.is_symmetric)
 print("Root to node 100", t.root_to_node(9))
 
 print("LCA of 2, 100 is", t.lca(2, 100))
+
+at = ArrayTree.from_tree(t)
+print("Array tree level ", at.level_order())
+print("Array tree matches -", at == t, at.to_tree() == t)
+print("Array tree diameter - ", at.diameter)
+print("Array tree boundary -", at.boundary_traversal())
+print("Array tree vertical - ", at.vertical_order())
+print("Array tree bottom view - ", at.bottom_view())
+print("Array tree LCA of 2, 100 is", at.lca(2, 100))
+
+
+def random_tree(n, seed=0):
+    # Binary search tree of n random keys: about 3 ln n deep
+    rng = random.Random(seed)
+    root = TreeNode(rng.randrange(n * 10))
+    for _ in range(n - 1):
+        value = rng.randrange(n * 10)
+        node = root
+        while True:
+            side = "left" if value < node.value else "right"
+            child = getattr(node, side)
+            if child is None:
+                setattr(node, side, TreeNode(value))
+                break
+            node = child
+    return Tree(root)
+
+
+def compare_array_tree(n=200_000):
+    tracemalloc.start()
+    tree = random_tree(n)
+    objects = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    at = ArrayTree.from_tree(tree)
+    arrays = sum(sys.getsizeof(a) for a in (at.left, at.right, at.value))
+    print(f"\n{n} nodes: TreeNode objects {objects / n:.0f} B/node, arrays {arrays / n:.0f} B/node")
+
+    values = at.level_order()
+    rng = random.Random(1)
+    pairs = [(rng.choice(values), rng.choice(values)) for _ in range(20)]
+    for name, run in [
+        ("level_order", lambda x: x.level_order()),
+        ("pre_order", lambda x: x.pre_order()),
+        ("in_order", lambda x: x.in_order()),
+        ("post_order", lambda x: x.post_order()),
+        ("height", lambda x: x.height()),
+        ("diameter", lambda x: x.diameter),
+        ("20 lca", lambda x: [x.lca(a, b) for a, b in pairs]),
+    ]:
+        timings = []
+        for x in (tree, at):
+            start = perf_counter()
+            run(x)
+            timings.append((perf_counter() - start) * 1000)
+        print(f"{name:12} Tree {timings[0]:8.1f} ms   ArrayTree {timings[1]:8.1f} ms")
+
+
+def complete_tree(n):
+    # Node i has children 2i + 1 and 2i + 2, built through ArrayTree for speed
+    left = array("i", [i if i < n else -1 for i in range(1, 2 * n, 2)])
+    right = array("i", [i if i < n else -1 for i in range(2, 2 * n + 1, 2)])
+    return ArrayTree(left, right, array("q", range(n))).to_tree()
+
+
+def compare_traversal_memory(n=10_000_000):
+    tree = complete_tree(n)
+    print(f"\nPeak memory of a full traversal, {n} nodes")
+    for name, run in [
+        ("level_order", lambda: tree.level_order()),
+        ("iter_level_order", lambda: deque(tree.iter_level_order(), maxlen=0)),
+        ("pre_order", lambda: tree.pre_order()),
+        ("iter_pre_order", lambda: deque(tree.iter_pre_order(), maxlen=0)),
+        ("morris_pre_order", lambda: deque(tree.morris_pre_order(), maxlen=0)),
+        ("in_order", lambda: tree.in_order()),
+        ("iter_in_order", lambda: deque(tree.iter_in_order(), maxlen=0)),
+        ("morris_in_order", lambda: deque(tree.morris_in_order(), maxlen=0)),
+        ("post_order", lambda: tree.post_order()),
+        ("iter_post_order", lambda: deque(tree.iter_post_order(), maxlen=0)),
+        ("zig_zag", lambda: tree.zig_zag()),
+        ("iter_zig_zag", lambda: deque(tree.iter_zig_zag(), maxlen=0)),
+    ]:
+        tracemalloc.start()
+        start = perf_counter()
+        run()
+        elapsed = perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:17} {peak / 1024:12.1f} KiB {elapsed:7.1f} s")
+
+
+def compare_lca(n=100_000, queries=1_000_000):
+    tree = random_tree(n)
+    values = tree.level_order()
+    rng = random.Random(2)
+    pairs = [(rng.choice(values).value, rng.choice(values).value) for _ in range(queries)]
+    print(f"\n{queries} LCA queries, {n} nodes")
+
+    start = perf_counter()
+    for a, b in pairs[:20]:
+        tree.lca(a, b)
+    walk = (perf_counter() - start) / 20
+    print(f"walk            {walk * 1e3:8.1f} ms/query, {walk * queries:8.0f} s for the batch (estimated)")
+
+    start = perf_counter()
+    index = tree.build_lca_index()
+    print(f"build index     {(perf_counter() - start) * 1e3:8.1f} ms, {len(index.table)} table rows")
+    for name, run in [
+        ("lca", tree.lca),
+        ("distance", tree.distance),
+        ("root_to_node", lambda a, b: tree.root_to_node(a)),
+    ]:
+        start = perf_counter()
+        for a, b in pairs:
+            run(a, b)
+        elapsed = perf_counter() - start
+        print(f"{name:15} {elapsed * 1e6 / queries:8.2f} us/query, {elapsed:8.2f} s for the batch")
+
+
+if __name__ == "__main__":
+    compare_array_tree()
+    compare_traversal_memory()
+    compare_lca()